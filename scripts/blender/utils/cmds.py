@@ -49,9 +49,15 @@ except:
 
 from core.libs.types import fi, li, asList, parseArgs, isType, asFloat, OrderedDict as od
 import re
+import json
+import math
+import sys
 import builtins
 import bmesh
+import numpy
 import threading
+import functools
+from collections import deque
 # depending if we are in python 2 or 3
 try:
     import Queue
@@ -61,8 +67,6 @@ except:
 
 
 reAttribute = re.compile('[^A-Za-z0-9\-_]+')
-global COPY_KEY_BUFFER
-COPY_KEY_BUFFER = []
 
 
 try:
@@ -103,6 +107,8 @@ class CONSTANTS(object):
     attributeConversion['scaleY'] = ['sy']
     attributeConversion['scaleZ'] = ['sz']
     transformAttributes = attributeConversion.keys()
+    # The per axis transform channels only, transformAttributes is a live view that also includes later entries
+    transformChannels = list(attributeConversion.keys())
 
     attributeConversion['location'] = ['translation', 'position', 't', 'l']
     attributeConversion['rotation'] = ['rotate', 'r', 'rotation_euler']
@@ -116,9 +122,17 @@ class CONSTANTS(object):
     coreAttributes = ['location', 'rotation', 'scale', 'hide', 'matrix_local', 'matrix_world',
                       'select', 'name']
 
+    # Inverted attributeConversion, alias: attribute. Use registerAttributeAlias to add to this
+    attributeAliases = dict()
+    for attribute, aliases in attributeConversion.items():
+        for alias in aliases:
+            attributeAliases[alias] = attribute
+
     attributeIndices = dict(X=0, Y=1, Z=2, W=3, R=0, G=1, B=2, A=3)
     attributeIndicesInverse = ['X', 'Y', 'Z', 'W']
 
+    dataTypeConversion = dict(light='lamp', rig='armature')
+
     constraints = dict(parent='COPY_TRANSFORMS', point='COPY_LOCATION',
                        orient='COPY_ROTATION', scale='COPY_SCALE',
                        location='COPY_LOCATION', rotation='COPY_ROTATION',
@@ -140,6 +154,16 @@ class CONSTANTS(object):
         dataTypes['metaball'] = bpy.data.metaballs
         dataTypes['armature'] = bpy.data.armatures
 
+    # The order in which string names are searched for in bpy.data, (dataType, bpy.data attribute)
+    dataTypeAttributes = [('object', 'objects'), ('mesh', 'meshes'), ('camera', 'cameras'),
+                          ('lamp', 'lamps'), ('curve', 'curves'), ('metaball', 'metaballs'),
+                          ('armature', 'armatures'), ('lattice', 'lattices'), ('library', 'libraries'),
+                          ('text', 'texts'), ('speaker', 'speakers'), ('sound', 'sounds'),
+                          ('image', 'images')]
+
+    # The mesh attribute for each component type
+    componentAttributes = dict(vertex='vertices', edge='edges', face='polygons')
+
     # To be used with the ls function, this points to where to get the data
     baseTypeDict = dict()
     if bpy:
@@ -315,7 +339,8 @@ class CONSTANTS(object):
     driverTransformConversion['rotation'] = ['ROT_X', 'ROT_Y', 'ROT_Z']
     driverTransformConversion['scale'] = ['SCALE_X', 'SCALE_Y', 'SCALE_Z']
 
-    matrixTransformAttrConversion = dict(location='to_translation', rotation='to_euler', scale='to_scale')
+    matrixTransformAttrConversion = dict(location='to_translation', rotation='to_euler', rotation_euler='to_euler',
+                                         scale='to_scale')
 
     renderFormats = ['BMP', 'IRIS', 'PNG', 'JPEG', 'JPEG2000', 'TARGA',
                      'TARGA_RAW', 'CINEON', 'DPX', 'OPEN_EXR_MULTILAYER',
@@ -441,415 +466,1024 @@ class Ptr(object):
         return item
 
 
-def getDataType(type, getParentCurve=False):
+class SceneGeneration(object):
     '''
-    Return all items that match the specified type
-    This is designed to be used internally
-
-    IN:
-        [type] type, the type to look for, example: bpy.types.Node
-        [bool] getParentCurve, specifically for getting drivers
+    This class is used internally to keep track of changes to the scene.
+    The generation is incremented by blender's depsgraph, undo and load handlers and by cmds functions
+    that remove data. Cached lookups compare against it to know when they need to be rebuilt.
+    If you are adding or removing data directly through bpy in a script call SceneGeneration.increment()
 
-    OUT:
-        [list] items
+    The evaluation counter is finer grained, it also changes on frame changes and when cmds sets values.
+    It is used by caches of evaluated data such as matrix decompositions.
+    If you are setting values directly through bpy in a script call SceneGeneration.incrementEvaluation()
     '''
-    def getNodeTrees():
-        '''
-        Get all node trees
+    generation = 0
+    evaluation = 0
 
-        OUT:
-            [list] items
-        '''
-        results = []
-        for items in [bpy.data.materials, bpy.data.worlds, bpy.data.scenes]:
-            for items in items:
-                nodeTree = items.nodeTree
-                if not nodeTree:
-                    continue
+    @classmethod
+    def increment(cls, *args, **kwargs):
+        cls.generation += 1
+        cls.evaluation += 1
+        return cls.generation
 
-            results.append(nodeTree)
+    @classmethod
+    def get(cls):
+        return cls.generation
 
-        return results
+    @classmethod
+    def incrementEvaluation(cls, *args, **kwargs):
+        cls.evaluation += 1
+        return cls.evaluation
 
+    @classmethod
+    def getEvaluation(cls):
+        return cls.evaluation
 
-    def getNodes(type=None):
-        '''
-        Get all nodes in blender, you can optionally pass in a type to filter
 
+try:
+    @bpy.app.handlers.persistent
+    def incrementSceneGeneration(*args, **kwargs):
+        SceneGeneration.increment()
+
+    @bpy.app.handlers.persistent
+    def incrementSceneEvaluation(*args, **kwargs):
+        SceneGeneration.incrementEvaluation()
+
+    sceneHandlers = [('depsgraph_update_post', incrementSceneGeneration),
+                     ('scene_update_post', incrementSceneGeneration),
+                     ('load_post', incrementSceneGeneration),
+                     ('undo_post', incrementSceneGeneration),
+                     ('redo_post', incrementSceneGeneration),
+                     ('frame_change_post', incrementSceneEvaluation)]
+
+    for handlerName, function in sceneHandlers:
+        handlers = getattr(bpy.app.handlers, handlerName, None)
+        if handlers is None:
+            continue
 
-        Optional:
-            [type] type, the type to look for, example: bpy.types.ShaderNodeOutputMaterial
+        # Make sure we do not double up when the module is reloaded
+        for handler in list(handlers):
+            if getattr(handler, '__name__', None) == function.__name__:
+                handlers.remove(handler)
 
-        OUT:
-            [list] items
-        '''
-        for nodeTree in getDataType(bpy.types.NodeTree):
-            for node in nodeTree.nodes:
-                if type is not None:
-                    if isType(node, type):
-                        yield node
+        handlers.append(function)
 
-                    else:
-                        continue
+except:
+    pass
 
-                yield node
 
+class DecompositionCache(object):
+    '''
+    This class is used internally to cache the decomposed transform matrices of objects.
+    Results are keyed by object and space and are dropped whenever the scene evaluation changes, see SceneGeneration.
+    Each result keeps a copy of the matrix it was decomposed from and is only used while the live matrix matches,
+    so values set directly through bpy are never returned stale.
+    Reading translate, rotate and scale of the same object in the same evaluation state decomposes the matrix once.
 
-    def getFCurves():
+    IN:
+        [func] evaluation : optional, function returning the current evaluation, default=SceneGeneration.getEvaluation
+    '''
+    def __init__(self, evaluation=None):
+        self.evaluation = evaluation or SceneGeneration.getEvaluation
+        self.current = None
+        self.items = dict()
+
+    def get(self, object, worldspace=False):
         '''
-        Get all animation curves
+        Returns the decomposed matrix of the object
+
+        IN:
+            [obj]  object
+            [bool] worldspace : If True will decompose matrix_world, otherwise matrix_local
 
         OUT:
-            [list] items
+            [dict] dict(location=Vector, rotation_euler=Euler, scale=Vector)
         '''
-        for action in getDataType(bpy.types.Action):
-            for curve in action.fcurves:
-                yield curve
+        evaluation = self.evaluation()
+        if not evaluation == self.current:
+            self.items.clear()
+            self.current = evaluation
 
+        key = (object.as_pointer() if hasattr(object, 'as_pointer') else id(object), worldspace)
+        matrix = object.matrix_world if worldspace else object.matrix_local
+        item = self.items.get(key)
+        if item is None or not item[0] == matrix:
+            location, rotation, scale = matrix.decompose()
+            item = (matrix.copy(), dict(location=location, rotation_euler=rotation.to_euler(), scale=scale))
+            self.items[key] = item
 
-    def getDrivers(getParentCurve=False):
-        '''
-        Get all drivers in blender
+        return item[1]
 
+    def clear(self):
+        self.items.clear()
+        self.current = None
 
-        Optional:
-            [bool] getParentCurve, if True will return the FCurve instead of the driver, default=False
 
-        OUT:
-            [list] items
-        '''
-        results = []
-        for dataType in CONSTANTS.baseTypeDict.keys():
-            if dataType in [bpy.types.FCurve, bpy.types.Driver]:
-                continue
+DECOMPOSITION_CACHE = DecompositionCache()
 
-            for item in getDataType(dataType):
-                if not hasattr(item, 'animation_data') or not item.animation_data:
-                    continue
 
-                for driver in item.animation_data.drivers:
-                    if not getParentCurve:
-                        driver = driver.driver
+class DataIndex(object):
+    '''
+    This class is used internally to hold a name and identity index of the data in blender.
+    The index is rebuilt lazily when the scene generation changes so repeated lookups are O(1).
+    Alongside the (dataType, name) index it keeps a map of each name to the first item with that name in
+    search order, so lookups without a data type are a single dictionary lookup as well.
+    Found items are validated against their name and names that are not in the index are searched for
+    directly, so an out of date index will never return the wrong name.
 
-                    results.append(driver)
+    IN:
+        [obj]  data       : optional, the data to index, default=bpy.data
+        [list] dataTypes  : optional, list of (dataType, attribute) in search order, default=CONSTANTS.dataTypeAttributes
+                          : each attribute must be an iterable collection of items with a name and a get(name) method
+        [func] generation : optional, function returning the current generation, default=SceneGeneration.get
+    '''
+    def __init__(self, data=None, dataTypes=None, generation=None):
+        self.data = data
+        self.dataTypes = dataTypes
+        self.generation = generation or SceneGeneration.get
+        self.builtGeneration = None
+        self.names = dict()
+        self.firstNames = dict()
+        self.identities = dict()
+
+    def getData(self):
+        return bpy.data if self.data is None else self.data
+
+    def getDataTypes(self):
+        return CONSTANTS.dataTypeAttributes if self.dataTypes is None else self.dataTypes
+
+    def getCollection(self, dataType):
+        for key, attribute in self.getDataTypes():
+            if key == dataType:
+                return getattr(self.getData(), attribute, None)
 
-        return results
+        return None
 
+    def getPriority(self, dataType):
+        for priority, (key, attribute) in enumerate(self.getDataTypes()):
+            if key == dataType:
+                return priority
 
-    def getModifiers(type=None):
-        '''
-        Get all modifiers in blender, you can optionally pass in a type to filter
+        return len(self.getDataTypes())
 
+    def clear(self):
+        self.builtGeneration = None
+        self.names = dict()
+        self.firstNames = dict()
+        self.identities = dict()
 
-        Optional:
-            [type] type, the type to look for, example: bpy.types.ArmatureModifier
+    def update(self, force=False):
+        '''
+        Rebuilds the index if the scene generation has changed
+
+        IN:
+            [bool] force, If True will always rebuild the index, default=False
 
         OUT:
-            [list] items
+            [bool] True if the index was rebuilt
         '''
-        results = []
-        for dataType in CONSTANTS.baseTypeDict.keys():
-            if dataType in [bpy.types.FCurve, bpy.types.Driver, bpy.types.Modifier, bpy.types.Constraint]:
-                continue
+        generation = self.generation()
+        if not force and generation == self.builtGeneration:
+            return False
 
-            for item in getDataType(dataType):
-                if not hasattr(item, 'modifiers'):
-                    continue
+        self.clear()
+        data = self.getData()
+        for priority, (dataType, attribute) in enumerate(self.getDataTypes()):
+            collection = getattr(data, attribute, None)
+            if collection is None:
+                continue
 
-                for modifier in item.modifiers:
-                    if type is not None:
-                        if isType(modifier, type):
-                            results.append(modifier)
+            identities = set()
+            for item in collection:
+                name = item.name
+                if (dataType, name) not in self.names:
+                    self.names[(dataType, name)] = item
 
-                        else:
-                            continue
+                if name not in self.firstNames:
+                    self.firstNames[name] = (priority, item)
 
-                results.append(modifier)
+                identities.add(item)
 
-        return results
+            self.identities[dataType] = identities
 
+        self.builtGeneration = generation
+        return True
 
-    def getConstraints(type=None):
+    def add(self, item, dataType):
         '''
-        Get all constraints in blender, you can optionally pass in a type to filter
-
+        Adds an item that was found after the index was built
+        '''
+        name = item.name
+        priority = self.getPriority(dataType)
+        self.names[(dataType, name)] = item
+        first = self.firstNames.get(name)
+        if first is None or priority <= first[0] or self.validate(first[1], name) is None:
+            self.firstNames[name] = (priority, item)
 
-        Optional:
-            [type] type, the type to look for, example: bpy.types.LimitLocationConstraint
+        if dataType in self.identities:
+            self.identities[dataType].add(item)
 
-        OUT:
-            [list] items
+    def validate(self, item, name):
         '''
-        results = []
-        for dataType in CONSTANTS.baseTypeDict.keys():
-            if dataType in [bpy.types.FCurve, bpy.types.Driver, bpy.types.Modifier, bpy.types.Constraint]:
-                continue
-
-            for item in getDataType(dataType):
-                if not hasattr(item, 'constraints'):
-                    continue
+        Returns the item if it still exists with the name, otherwise None
+        '''
+        if item is None:
+            return None
 
-                for constraint in item.modifiers:
-                    if type is not None:
-                        if isType(constraint, type):
-                            results.append(constraint)
+        try:
+            if item.name == name:
+                return item
 
-                        else:
-                            continue
+        except ReferenceError:
+            pass
 
-                    results.append(constraint)
+        return None
 
-        return results
+    def lookup(self, name, dataType=None):
+        '''
+        Find an item by name in the index only, this does not update the index
+        Without a data type the first data type in search order containing the name wins
 
-    if type in CONSTANTS.baseTypeDict.keys():
-        return list(CONSTANTS.baseTypeDict.get(type))
+        IN:
+            [str] name
+            [str] dataType, optional, only look in this data type
 
-    elif type in [bpy.types.NodeTree]:
-        return list(getNodeTrees())
+        OUT:
+            [obj] item or None
+        '''
+        if dataType:
+            return self.validate(self.names.get((dataType, name)), name)
 
-    elif type in [bpy.types.Node]:
-        return list(getNodes())
+        first = self.firstNames.get(name)
+        return None if first is None else self.validate(first[1], name)
 
-    elif type in [bpy.types.FCurve]:
-        return list(getFCurves())
+    def find(self, name, dataType=None):
+        '''
+        Find an item by name, without a data type the first data type in search order containing the name wins
 
-    elif type in [bpy.types.Driver]:
-        return list(getDrivers(getParentCurve=getParentCurve))
+        IN:
+            [str] name
+            [str] dataType, optional, only look in this data type
 
-    elif type in [bpy.types.Modifier]:
-        return list(getModifiers())
+        OUT:
+            [obj] item or None
+        '''
+        self.update()
+        item = self.lookup(name, dataType)
+        if item is not None:
+            return item
 
-    elif type in [bpy.types.Constraint]:
-        return list(getConstraints())
+        # The item may have been renamed or created since the index was built
+        dataTypes = [dataType] if dataType else [key for key, attribute in self.getDataTypes()]
+        for key in dataTypes:
+            collection = self.getCollection(key)
+            if collection is None:
+                continue
 
-    elif type in CONSTANTS.subTypeDict[bpy.types.Modifier]:
-        return list(getModifiers(type))
+            item = collection.get(name)
+            if item:
+                self.add(item, key)
+                return item
 
-    elif type in CONSTANTS.subTypeDict[bpy.types.Constraint]:
-        return list(getConstraints(type))
+        return None
 
-    elif type in CONSTANTS.subTypeDict[bpy.types.Node]:
-        return list(getNodes(type))
+    def findAll(self, names, dataType=None):
+        '''
+        Find a list of items by name, names are looked up in the index and any that are missing are
+        searched for together with a single pass over each collection
+        Items that could not be found are returned as None
 
-    print('WARNING: invalid type: {0}'.format(type))
-    return []
+        IN:
+            [list] names
+            [str]  dataType, optional, only look in this data type
 
+        OUT:
+            [list] items in the same order as names
+        '''
+        self.update()
+        results = [None] * len(names)
+        missing = dict()
+        for i, name in enumerate(names):
+            item = self.lookup(name, dataType)
+            if item is None:
+                missing.setdefault(name, []).append(i)
 
-def ls(search=None,
-       flatten=None, fl=None,
-       type=None, t=None,
-       referencedNodes=None, rn=None,
-       selection=None, sl=None,
-       visible=None, v=None,
-       invisible=None, iv=None,
-       regex=None, rgx=None,
-       caseInsensitive=None, ci=None,
-       getParentCurve=None, gpc=None,
-       *args, **kwargs):
-    '''
-    The ls command returns the names (and optionally the type names) of objects in the scene.
-    ls will always return a list of objects, unless the type is a component then it is a list of tuples.
-    If flatten is True, component mode will return a list of components instead of tuples
-    If search is an object or list of objects, it will search for components on the search objects
+            else:
+                results[i] = item
 
-    Optional Parameters:
-        [str]  search             : String to search for
-        [bool] flatten/fl         : Flattens the returned list of objects so that each component is identified individually, default=False
-                                  : This is useful when listing components and you do not want a list of tuples
-        [str]  type/t             : Type of item to return, accepts string or type class
-        [bool] referencedNodes/rn : Returns only items from a linked library, default=False
-        [bool] selection/sl       : Returns selected objects, default=False
-        [bool] visible/v          : Returns visible objects, default=False
-        [bool] invisible/iv       : returns hidden objects, default=False
-        [bool] regex              : Enables regular expression searching, default=False
-        [bool] getParentCurve/gpc : If True will get the parent curve when listing drivers, default=False
+        dataTypes = [dataType] if dataType else [key for key, attribute in self.getDataTypes()]
+        for key in dataTypes:
+            if not missing:
+                break
 
-    Out:
-        [list] objects
+            collection = self.getCollection(key)
+            if collection is None:
+                continue
 
-    '''
-    # Parse arguments
-    flatten = parseArgs(flatten, fl, False)
-    objectType = parseArgs(type, t, None)
-    referencedNodes = parseArgs(referencedNodes, rn, False)
-    selection = parseArgs(selection, sl, False)
-    visible = parseArgs(visible, v, False)
-    regex = parseArgs(regex, rgx, False)
-    caseInsensitive = parseArgs(caseInsensitive, ci, False)
-    invisible = parseArgs(invisible, iv, False)
-    getParentCurve = parseArgs(getParentCurve, gpc, False)
-    type = builtins.type
+            for item in collection:
+                indices = missing.pop(item.name, None)
+                if indices is None:
+                    continue
 
-    def mesh(data, selection=False, type='component'):
-        if selection:
-            b = bmesh.from_edit_mesh(data)
-            if type == 'component':
-                selectMode = fi(list(b.select_mode)) or 'VERT'
-                type = {'VERT': 'vertex', 'EDGE': 'edge', 'FACE': 'face'}.get(selectMode)
+                self.add(item, key)
+                for i in indices:
+                    results[i] = item
 
-        else:
-            b = bmesh.new()
-            b.from_mesh(data)
+                if not missing:
+                    break
 
-        if type == 'vertex':
-            components = b.verts
-            cData = data.vertices
+        return results
 
-        elif type == 'edge':
-            components = b.edges
-            cData = data.edges
+    def contains(self, item, dataType=None):
+        '''
+        Check if the item exists in the data
 
-        elif type == 'face':
-            components = b.faces
-            cData = data.polygons
+        IN:
+            [obj] item
+            [str] dataType, optional, only look in this data type
 
-        else:
-            components = b.verts
+        OUT:
+            [bool] result
+        '''
+        self.update()
+        dataTypes = [dataType] if dataType else [key for key, attribute in self.getDataTypes()]
+        try:
+            name = getattr(item, 'name', None)
+            dataTypes = [key for key in dataTypes if item in self.identities.get(key, ())] or dataTypes
 
-        if selection:
-            components = [c for c in components if c.select]
+        except (TypeError, ReferenceError):
+            return False
 
-        result = [cData[c.index] for c in components]
-        return result
+        if not isType(name, str):
+            return False
 
-    def curve(data, selection=False):
-        points = []
-        for spline in data.splines:
-            if spline.type.lower() == 'nurbs':
-                if selection:
-                    for point in spline.points:
-                        if not point.select:
-                            continue
-                        points.append(point)
+        # Validate hits as well, the item may have been removed since the index was built
+        for key in dataTypes:
+            collection = self.getCollection(key)
+            if collection is not None and collection.get(name) == item:
+                self.add(item, key)
+                return True
 
-                else:
-                    points += list(spline.points)
+        return False
 
-            else:
-                if selection:
-                    for point in spline.bezier_points:
-                        if not any([point.select_control_point, point.select_left_handle, point.select_right_handle]):
-                            continue
-                        points.append(point)
 
-                else:
-                    points += list(spline.bezier_points)
-        return points
+DATA_INDEX = DataIndex()
 
-    def component(objects, selection=False, flatten=False, type='component'):
-        objectType = type
-        type = builtins.type
-        results = []
 
-        for obj in objects:
-            oData = obj.data
-            if selection and not (hasattr(oData, 'is_editmode') and oData.is_editmode):
-                continue
+class TypeRegistry(object):
+    '''
+    This class is used internally to hold a registry of modifiers, constraints and nodes by type.
+    The registry is built with a single pass over the scene and is rebuilt when the scene generation changes,
+    so looking up a type is a dictionary lookup. cmds functions that add or remove modifiers, constraints or nodes
+    increment the generation, as modifiers, constraints and nodes are not IDs and must never be touched after
+    they have been removed. If you remove them directly through bpy in a script call SceneGeneration.increment()
+    Looking up a type returns every instance of that type or any of its subclasses in scene order.
 
-            if type(oData) == bpy.types.Mesh:
-                result = mesh(oData, selection, type=objectType)
+    IN:
+        [func] generation : optional, function returning the current generation, default=SceneGeneration.get
+    '''
+    def __init__(self, generation=None):
+        self.generation = generation or SceneGeneration.get
+        self.clear()
+
+    def clear(self):
+        self.builtGeneration = None
+        self.items = []
+        self.owners = []
+        self.classes = dict()
+        self.queries = dict()
+
+    def getStacks(self, owner):
+        stacks = [getattr(owner, stack, None) for stack in ['modifiers', 'constraints']]
+        nodeTree = getattr(owner, 'node_tree', None)
+        if nodeTree:
+            stacks.append(nodeTree.nodes)
+
+        return [stack for stack in stacks if stack is not None]
+
+    def getStackOwners(self):
+        seen = set()
+        for collection in list(CONSTANTS.baseTypeDict.values()) + [bpy.data.materials, bpy.data.worlds,
+                                                                   bpy.data.scenes]:
+            for owner in collection:
+                pointer = owner.as_pointer()
+                if pointer in seen:
+                    continue
 
-            elif type(oData) == bpy.types.Curve:
-                result = curve(oData, selection)
+                seen.add(pointer)
+                yield owner
 
-            else:
-                print('invalid type {0}: {1}'.format(type(obj), obj))
+    def register(self, item, owner):
+        self.classes.setdefault(type(item), []).append(len(self.items))
+        self.items.append(item)
+        self.owners.append(owner)
 
-        if flatten:
-            results += result
+    def update(self, force=False):
+        '''
+        Rebuilds the registry if the scene has changed
 
-        else:
-            results.append((obj, result))
+        IN:
+            [bool] force, If True will always rebuild the registry, default=False
+        '''
+        generation = self.generation()
+        if not force and generation == self.builtGeneration:
+            return
 
-        return results
+        self.clear()
+        for owner in self.getStackOwners():
+            for stack in self.getStacks(owner):
+                for item in stack:
+                    self.register(item, owner)
 
-    def filterItems(items, type=None, search=None, selection=False,
-                    visible=None, invisible=None, regex=False,
-                    referencedNodes=False, caseInsensitive=False):
-        results = []
+        self.builtGeneration = generation
 
-        for item in items:
-            # Check Type
-            if type:
-                if isType(type, str):
-                    # case insensitive due to blender using caps and maya using lower case
-                    if not item.type.lower() == type.lower():
-                        continue
+    def getIndices(self, type):
+        self.update()
+        if type not in self.queries:
+            indices = []
+            for cls, clsIndices in self.classes.items():
+                if issubclass(cls, type):
+                    indices += clsIndices
 
-                # Only check subtypes as by this point we have already been filtered through main types
-                elif type in CONSTANTS.subTypes:
-                    if not type(item) == type:
-                        continue
+            self.queries[type] = sorted(indices)
 
-            if selection and (hasattr(item, 'select') and not item.select):
-                continue
+        return self.queries[type]
 
-            # Check visibility
-            isVisible = not item.hide if hasattr(item, 'hide') else False
-            if visible is True and not isVisible:
-                continue
+    def get(self, type):
+        '''
+        Get all instances of the type
 
-            if invisible is True and isVisible:
-                continue
+        IN:
+            [type] type, example: bpy.types.ArmatureModifier
 
-            isReferenced = item.library if hasattr(item, 'library') else False
-            if referencedNodes and not isReferenced:
-                continue
+        OUT:
+            [list] items
+        '''
+        return [self.items[i] for i in self.getIndices(type)]
 
-            # Check name
-            if search and hasattr(item, 'name'):
-                name = item.name
-                if regex:
-                    if not re.match(search, name):
-                        continue
+    def getOwners(self, type):
+        '''
+        Get the unique owners of all the instances of the type, example: the objects with armature modifiers
 
-                elif caseInsensitive:
-                    if search.lower() not in name.lower():
-                        continue
+        IN:
+            [type] type, example: bpy.types.ArmatureModifier
 
-                else:
-                    if search not in name:
-                        continue
+        OUT:
+            [list] owners
+        '''
+        results = []
+        seen = set()
+        for i in self.getIndices(type):
+            owner = self.owners[i]
+            if owner in seen:
+                continue
 
-            results.append(item)
+            seen.add(owner)
+            results.append(owner)
 
         return results
 
-    results = []
-
-    # COMPONENTS
-    # Different way to check components as it is a lot more restricted
-    # Still need support for lattice and metaballs
-    if objectType in ['component', 'vertex', 'edge', 'face', 'cv', 'spline', 'point']:
-        if not any([search, selection]):
-            print('WARNING: objects or selection Parameters required when listing components')
-            return []
 
-        if search:
-            search = asList(search)
-            objects = asObjects(search)
+TYPE_REGISTRY = TypeRegistry()
 
-        else:
-            objects = ls(sl=1)
 
-        if not objects:
-            return []
+def getDataType(type, getParentCurve=False, iterate=False):
+    '''
+    Return all items that match the specified type
+    This is designed to be used internally
 
-        return component(objects, selection=selection, type=objectType, flatten=flatten)
+    IN:
+        [type] type, the type to look for, example: bpy.types.Node
+        [bool] getParentCurve, specifically for getting drivers
+        [bool] iterate, If True will return a generator instead of a list, default=False
 
-    # OBJECTS
+    OUT:
+        [list] items
+    '''
+    def getNodeTrees():
+        '''
+        Get all node trees
+
+        OUT:
+            [generator] items
+        '''
+        for items in [bpy.data.materials, bpy.data.worlds, bpy.data.scenes]:
+            for item in items:
+                nodeTree = getattr(item, 'node_tree', None)
+                if not nodeTree:
+                    continue
+
+                yield nodeTree
+
+
+    def getFCurves():
+        '''
+        Get all animation curves
+
+        OUT:
+            [generator] items
+        '''
+        for action in getDataType(bpy.types.Action, iterate=True):
+            for curve in action.fcurves:
+                yield curve
+
+
+    def getDrivers(getParentCurve=False):
+        '''
+        Get all drivers in blender
+
+
+        Optional:
+            [bool] getParentCurve, if True will return the FCurve instead of the driver, default=False
+
+        OUT:
+            [generator] items
+        '''
+        for dataType in CONSTANTS.baseTypeDict.keys():
+            for item in getDataType(dataType, iterate=True):
+                animationData = getattr(item, 'animation_data', None)
+                if not animationData:
+                    continue
+
+                for driver in animationData.drivers:
+                    if not getParentCurve:
+                        driver = driver.driver
+
+                    yield driver
+
+
+    results = None
+    if type in CONSTANTS.baseTypeDict.keys():
+        results = iter(CONSTANTS.baseTypeDict.get(type))
+
+    elif type in [bpy.types.NodeTree]:
+        results = getNodeTrees()
+
+    elif type in [bpy.types.FCurve]:
+        results = getFCurves()
+
+    elif type in [bpy.types.Driver]:
+        results = getDrivers(getParentCurve=getParentCurve)
+
+    # Modifiers, constraints and nodes are looked up in the registry by type
+    elif type in CONSTANTS.subTypeDict.keys() or type in CONSTANTS.subTypeList:
+        results = iter(TYPE_REGISTRY.get(type))
+
+    if results is None:
+        print('WARNING: invalid type: {0}'.format(type))
+        results = iter([])
+
+    if iterate:
+        return results
+
+    return list(results)
+
+
+def compileFilter(type=None, search=None, selection=False,
+                  visible=False, invisible=False, regex=False,
+                  referencedNodes=False, caseInsensitive=False):
+    '''
+    This is used internally by ls, it compiles the filter flags into a single function.
+    The flags are only parsed once and only the checks that are needed are added,
+    search strings are lowered and regular expressions are compiled up front.
+    Type classes are not checked as they have already been filtered by getDataType.
+
+    Optional:
+        Same as the ls flags
+
+    OUT:
+        [function] check(item), returns True if the item passes all the filters
+    '''
+    checks = []
+
+    # case insensitive due to blender using caps and maya using lower case
+    if type and isType(type, str):
+        itemType = type.lower()
+        checks.append(lambda item: str(getattr(item, 'type', '')).lower() == itemType)
+
+    if selection:
+        checks.append(lambda item: not hasattr(item, 'select') or bool(item.select))
+
+    # Items without a hide attribute are considered invisible
+    if visible:
+        checks.append(lambda item: hasattr(item, 'hide') and not item.hide)
+
+    if invisible:
+        checks.append(lambda item: not hasattr(item, 'hide') or bool(item.hide))
+
+    if referencedNodes:
+        checks.append(lambda item: bool(getattr(item, 'library', None)))
+
+    if search and isType(search, str):
+        if regex:
+            pattern = re.compile(search, re.IGNORECASE if caseInsensitive else 0)
+            match = lambda name: pattern.match(name) is not None
+
+        elif caseInsensitive:
+            lowerSearch = search.lower()
+            match = lambda name: lowerSearch in name.lower()
+
+        else:
+            match = lambda name: search in name
+
+        checks.append(lambda item: not hasattr(item, 'name') or match(item.name))
+
+    def check(item):
+        for c in checks:
+            if not c(item):
+                return False
+
+        return True
+
+    return check
+
+
+def filterItems(items, check=None):
+    '''
+    This is used internally by ls, it streams the items through a compiled filter
+    Items such as constraints and modifiers can be returned multiple times, they are only yielded once
+    while maintaining the original order
+
+    IN:
+        [list]     items
+        [function] check, optional, see compileFilter
+
+    OUT:
+        [generator] items
+    '''
+    seen = set()
+    for item in items:
+        if item in seen:
+            continue
+
+        if check is not None and not check(item):
+            continue
+
+        seen.add(item)
+        yield item
+
+
+def getComponentArrays(object, type='vertex', selection=False, mask=False, coordinates=False):
+    '''
+    Returns the components of a mesh as numpy index arrays instead of lists of components.
+    The data is read in bulk with foreach_get, a bmesh is only used when the object is in edit mode
+    and the edit mesh cannot be synced back to the mesh data.
+
+    IN:
+        [obj]  object      : The mesh object or mesh data to query
+        [str]  type        : vertex, edge, face or component to use the current select mode, default=vertex
+        [bool] selection   : If True will only return the selected components, default=False
+        [bool] mask        : If True will include the select state of every component, default=False
+        [bool] coordinates : If True will include the coordinates of the returned components, default=False
+                           : vertex positions, edge midpoints or face centers
+
+    OUT:
+        [dict] dict(type=str, count=int, indices=array, select=array, co=array)
+    '''
+    data = getattr(object, 'data', None) or object
+    editMode = bool(getattr(data, 'is_editmode', False))
+
+    if type == 'component':
+        selectMode = list(bpy.context.tool_settings.mesh_select_mode)
+        type = 'vertex' if not any(selectMode) else ['vertex', 'edge', 'face'][selectMode.index(True)]
+
+    if type not in CONSTANTS.componentAttributes.keys():
+        raise RuntimeError('getComponentArrays: invalid type: {0}'.format(type))
+
+    # Edit mode changes are not stored on the mesh until it is synced
+    if editMode and any([selection, mask, coordinates]) and hasattr(object, 'update_from_editmode'):
+        object.update_from_editmode()
+        editMode = False
+
+    components = getattr(data, CONSTANTS.componentAttributes.get(type))
+    count = len(components)
+    results = dict(type=type, count=count)
+
+    select = None
+    co = None
+    if editMode and any([selection, mask, coordinates]):
+        b = bmesh.from_edit_mesh(data)
+        bComponents = getattr(b, dict(vertex='verts', edge='edges', face='faces').get(type))
+        # The edit mesh may have a different number of components than the mesh data until it is synced
+        count = len(bComponents)
+        results['count'] = count
+        select = numpy.fromiter((c.select for c in bComponents), dtype=bool, count=count)
+        if coordinates:
+            if type == 'vertex':
+                co = numpy.array([c.co[:] for c in bComponents], dtype=numpy.float32).reshape(-1, 3)
+
+            elif type == 'edge':
+                co = numpy.array([((c.verts[0].co + c.verts[1].co) * 0.5)[:] for c in bComponents],
+                                 dtype=numpy.float32).reshape(-1, 3)
+
+            else:
+                co = numpy.array([c.calc_center_median()[:] for c in bComponents],
+                                 dtype=numpy.float32).reshape(-1, 3)
+
+    else:
+        if any([selection, mask]):
+            select = numpy.zeros(count, dtype=bool)
+            components.foreach_get('select', select)
+
+        if coordinates:
+            if type == 'edge':
+                positions = numpy.zeros(len(data.vertices) * 3, dtype=numpy.float32)
+                data.vertices.foreach_get('co', positions)
+                positions = positions.reshape(-1, 3)
+                vertices = numpy.zeros(count * 2, dtype=numpy.int32)
+                components.foreach_get('vertices', vertices)
+                vertices = vertices.reshape(-1, 2)
+                co = (positions[vertices[:, 0]] + positions[vertices[:, 1]]) * 0.5
+
+            else:
+                co = numpy.zeros(count * 3, dtype=numpy.float32)
+                components.foreach_get('co' if type == 'vertex' else 'center', co)
+                co = co.reshape(-1, 3)
+
+    indices = numpy.flatnonzero(select) if selection else numpy.arange(count)
+    results['indices'] = indices
+
+    if mask:
+        results['select'] = select
+
+    if coordinates:
+        results['co'] = co[indices] if selection else co
+
+    return results
+
+
+def getCurveArrays(object, selection=False):
+    '''
+    Returns the points of a curve as flattened numpy arrays instead of lists of points.
+    Each spline is read in bulk with foreach_get, points for spline i are in the range offsets[i]:offsets[i+1].
+    Nurbs and poly splines do not have handles, their handles are set to the point positions.
+    The arrays can be edited and written back with setCurveArrays
+
+    IN:
+        [obj]  object    : The curve object or curve data to query
+        [bool] selection : If True indices will only include selected points, default=False
+
+    OUT:
+        [dict] dict(offsets=array, bezier=array, indices=array, co=array, handle_left=array,
+                    handle_right=array, weight=array, select=array)
+    '''
+    data = getattr(object, 'data', None) or object
+    splines = list(data.splines)
+    bezier = numpy.array([spline.type == 'BEZIER' for spline in splines], dtype=bool)
+    counts = [len(spline.bezier_points if isBezier else spline.points) for spline, isBezier in zip(splines, bezier)]
+    offsets = numpy.zeros(len(splines) + 1, dtype=numpy.int64)
+    offsets[1:] = numpy.cumsum(counts)
+    total = int(offsets[-1])
+
+    co = numpy.zeros((total, 3), dtype=numpy.float32)
+    handleLeft = numpy.zeros((total, 3), dtype=numpy.float32)
+    handleRight = numpy.zeros((total, 3), dtype=numpy.float32)
+    weight = numpy.ones(total, dtype=numpy.float32)
+    select = numpy.zeros(total, dtype=bool)
+
+    for i, spline in enumerate(splines):
+        start, end = int(offsets[i]), int(offsets[i+1])
+        if start == end:
+            continue
+
+        if bezier[i]:
+            points = spline.bezier_points
+            points.foreach_get('co', co[start:end].reshape(-1))
+            points.foreach_get('handle_left', handleLeft[start:end].reshape(-1))
+            points.foreach_get('handle_right', handleRight[start:end].reshape(-1))
+            mask = numpy.zeros(end - start, dtype=bool)
+            for attr in ['select_control_point', 'select_left_handle', 'select_right_handle']:
+                points.foreach_get(attr, mask)
+                select[start:end] |= mask
+
+        else:
+            points = spline.points
+            position = numpy.zeros((end - start, 4), dtype=numpy.float32)
+            points.foreach_get('co', position.reshape(-1))
+            co[start:end] = position[:, :3]
+            weight[start:end] = position[:, 3]
+            handleLeft[start:end] = co[start:end]
+            handleRight[start:end] = co[start:end]
+            points.foreach_get('select', select[start:end])
+
+    indices = numpy.flatnonzero(select) if selection else numpy.arange(total)
+    return dict(offsets=offsets, bezier=bezier, indices=indices, co=co, handle_left=handleLeft,
+                handle_right=handleRight, weight=weight, select=select)
+
+
+def setCurveArrays(object, arrays):
+    '''
+    Writes point positions and handles back to a curve in bulk with foreach_set.
+    The arrays must be in the layout returned by getCurveArrays, only co, handle_left, handle_right
+    and weight are written, any that are missing are left untouched.
+
+    IN:
+        [obj]  object : The curve object or curve data to edit
+        [dict] arrays : dict(co=array, handle_left=array, handle_right=array, weight=array)
+    '''
+    data = getattr(object, 'data', None) or object
+    splines = list(data.splines)
+    counts = [len(spline.bezier_points if spline.type == 'BEZIER' else spline.points) for spline in splines]
+
+    values = dict()
+    for attr in ['co', 'handle_left', 'handle_right', 'weight']:
+        if arrays.get(attr) is None:
+            continue
+
+        value = numpy.ascontiguousarray(arrays.get(attr), dtype=numpy.float32)
+        values[attr] = value.reshape(-1) if attr == 'weight' else value.reshape(-1, 3)
+        if not len(values[attr]) == sum(counts):
+            raise RuntimeError('setCurveArrays: {0} does not match the number of points on {1}'.format(attr, data.name))
+
+    start = 0
+    for spline, count in zip(splines, counts):
+        end = start + count
+        if not count:
+            pass
+
+        elif spline.type == 'BEZIER':
+            points = spline.bezier_points
+            for attr in ['co', 'handle_left', 'handle_right']:
+                if attr in values:
+                    points.foreach_set(attr, values[attr][start:end].reshape(-1))
+
+        elif any([attr in values for attr in ['co', 'weight']]):
+            points = spline.points
+            position = numpy.zeros((count, 4), dtype=numpy.float32)
+            points.foreach_get('co', position.reshape(-1))
+            if 'co' in values:
+                position[:, :3] = values['co'][start:end]
+
+            if 'weight' in values:
+                position[:, 3] = values['weight'][start:end]
+
+            points.foreach_set('co', position.reshape(-1))
+
+        start = end
+
+    if hasattr(data, 'update_tag'):
+        data.update_tag()
+
+
+def ls(search=None,
+       flatten=None, fl=None,
+       type=None, t=None,
+       referencedNodes=None, rn=None,
+       selection=None, sl=None,
+       visible=None, v=None,
+       invisible=None, iv=None,
+       regex=None, rgx=None,
+       caseInsensitive=None, ci=None,
+       getParentCurve=None, gpc=None,
+       iterate=None, it=None,
+       array=None, arr=None,
+       *args, **kwargs):
+    '''
+    The ls command returns the names (and optionally the type names) of objects in the scene.
+    ls will always return a list of objects, unless the type is a component then it is a list of tuples.
+    If flatten is True, component mode will return a list of components instead of tuples
+    If search is an object or list of objects, it will search for components on the search objects
+    If iterate is True a generator is returned and items are only found as they are requested,
+    this is much faster when you only need the first match, eg: fi(ls(type='MESH', it=True))
+    Do note that when iterating the active object is not moved to the end of the results
+    If array is True, components are returned as (object, arrays) using getComponentArrays or getCurveArrays
+
+    Optional Parameters:
+        [str]  search             : String to search for
+        [bool] flatten/fl         : Flattens the returned list of objects so that each component is identified individually, default=False
+                                  : This is useful when listing components and you do not want a list of tuples
+        [str]  type/t             : Type of item to return, accepts string or type class
+        [bool] referencedNodes/rn : Returns only items from a linked library, default=False
+        [bool] selection/sl       : Returns selected objects, default=False
+        [bool] visible/v          : Returns visible objects, default=False
+        [bool] invisible/iv       : returns hidden objects, default=False
+        [bool] regex              : Enables regular expression searching, default=False
+        [bool] getParentCurve/gpc : If True will get the parent curve when listing drivers, default=False
+        [bool] iterate/it         : If True will return a generator instead of a list, default=False
+        [bool] array/arr          : If True will return components as numpy arrays, default=False
+
+    Out:
+        [list] objects
+
+    '''
+    # Parse arguments
+    flatten = parseArgs(flatten, fl, False)
+    objectType = parseArgs(type, t, None)
+    referencedNodes = parseArgs(referencedNodes, rn, False)
+    selection = parseArgs(selection, sl, False)
+    visible = parseArgs(visible, v, False)
+    regex = parseArgs(regex, rgx, False)
+    caseInsensitive = parseArgs(caseInsensitive, ci, False)
+    invisible = parseArgs(invisible, iv, False)
+    getParentCurve = parseArgs(getParentCurve, gpc, False)
+    iterate = parseArgs(iterate, it, False)
+    array = parseArgs(array, arr, False)
+    type = builtins.type
+
+    def mesh(obj, selection=False, type='component', array=False):
+        if type not in ['component', 'vertex', 'edge', 'face']:
+            type = 'vertex'
+
+        arrays = getComponentArrays(obj, type=type, selection=selection)
+        if array:
+            return arrays
+
+        cData = getattr(obj.data, CONSTANTS.componentAttributes.get(arrays['type']))
+        if not selection:
+            return list(cData)
+
+        return [cData[i] for i in arrays['indices']]
+
+    def curve(data, selection=False):
+        points = []
+        for spline in data.splines:
+            if spline.type.lower() == 'nurbs':
+                if selection:
+                    for point in spline.points:
+                        if not point.select:
+                            continue
+                        points.append(point)
+
+                else:
+                    points += list(spline.points)
+
+            else:
+                if selection:
+                    for point in spline.bezier_points:
+                        if not any([point.select_control_point, point.select_left_handle, point.select_right_handle]):
+                            continue
+                        points.append(point)
+
+                else:
+                    points += list(spline.bezier_points)
+        return points
+
+    def component(objects, selection=False, flatten=False, type='component', array=False):
+        objectType = type
+        type = builtins.type
+        results = []
+
+        for obj in objects:
+            oData = obj.data
+            if selection and not (hasattr(oData, 'is_editmode') and oData.is_editmode):
+                continue
+
+            if type(oData) == bpy.types.Mesh:
+                result = mesh(obj, selection, type=objectType, array=array)
+
+            elif type(oData) == bpy.types.Curve:
+                result = getCurveArrays(obj, selection) if array else curve(oData, selection)
+
+            else:
+                print('invalid type {0}: {1}'.format(type(obj), obj))
+                continue
+
+            if flatten and not array:
+                results += result
+
+            else:
+                results.append((obj, result))
+
+        return results
+
+    results = []
+
+    # COMPONENTS
+    # Different way to check components as it is a lot more restricted
+    # Still need support for lattice and metaballs
+    if objectType in ['component', 'vertex', 'edge', 'face', 'cv', 'spline', 'point']:
+        if not any([search, selection]):
+            print('WARNING: objects or selection Parameters required when listing components')
+            return iter([]) if iterate else []
+
+        if search:
+            search = asList(search)
+            objects = asObjects(search)
+
+        else:
+            objects = ls(sl=1)
+
+        if not objects:
+            return iter([]) if iterate else []
+
+        results = component(objects, selection=selection, type=objectType, flatten=flatten, array=array)
+        return iter(results) if iterate else results
+
+    # OBJECTS
     if objectType in CONSTANTS.typesList:
-        items = getDataType(objectType, getParentCurve=getParentCurve)
+        items = getDataType(objectType, getParentCurve=getParentCurve, iterate=True)
 
     else:
         items = bpy.data.objects
 
-    results = filterItems(items, type=objectType, search=search, selection=selection,
+    check = compileFilter(type=objectType, search=search, selection=selection,
                           visible=visible, invisible=invisible, regex=regex,
                           referencedNodes=referencedNodes, caseInsensitive=caseInsensitive)
 
-    # Items such as constraints and modifiers can be returned multiple times, filter them out here
-    results = list(set(results))
+    if iterate:
+        return filterItems(items, check)
+
+    results = list(filterItems(items, check))
 
     # Make sure the active object is always last
     activeObject = bpy.context.scene.objects.active
@@ -860,6 +1494,21 @@ def ls(search=None,
     return results
 
 
+def ils(*args, **kwargs):
+    '''
+    Iterative version of ls, this is the same as ls(iterate=True)
+    Items are yielded as they are found so you can stop as soon as you have what you need
+
+    Optional Parameters:
+        Same as ls
+
+    Out:
+        [generator] objects
+    '''
+    kwargs['iterate'] = True
+    return ls(*args, **kwargs)
+
+
 def parent(objects=None, target=None,
            world=None, w=None,
            relative=None, r=None,
@@ -904,6 +1553,8 @@ def parent(objects=None, target=None,
     else:
         bpy.ops.object.parent_set(type='OBJECT', keep_transform=bool(absolute))
 
+    SceneGeneration.increment()
+
     if selection:
         select(selection)
 
@@ -982,6 +1633,111 @@ def select(objects=None,
     #     bpy.ops.object.mode_set(mode='EDIT')
 
 
+class HierarchyIndex(object):
+    '''
+    This class is used internally to hold a parent to children index of the objects in blender.
+    obj.children scans every object in the scene, this index is built with a single pass and is rebuilt
+    when the scene generation or the number of objects changes. parent and delete increment the generation,
+    if you change the hierarchy directly through bpy in a script call SceneGeneration.increment()
+
+    IN:
+        [obj]  data       : optional, the data to index, default=bpy.data
+        [func] generation : optional, function returning the current generation, default=SceneGeneration.get
+    '''
+    def __init__(self, data=None, generation=None):
+        self.data = data
+        self.generation = generation or SceneGeneration.get
+        self.builtGeneration = None
+        self.signature = None
+        self.children = dict()
+
+    def getObjects(self):
+        return (bpy.data if self.data is None else self.data).objects
+
+    def update(self, force=False):
+        '''
+        Rebuilds the index if the scene has changed
+
+        IN:
+            [bool] force, If True will always rebuild the index, default=False
+        '''
+        objects = self.getObjects()
+        generation = self.generation()
+        signature = len(objects)
+        if not force and generation == self.builtGeneration and signature == self.signature:
+            return
+
+        self.children = dict()
+        for obj in objects:
+            parent = obj.parent
+            if parent is None:
+                continue
+
+            if parent not in self.children:
+                self.children[parent] = []
+
+            self.children[parent].append(obj)
+
+        self.builtGeneration = generation
+        self.signature = signature
+
+    def getChildren(self, obj):
+        '''
+        Get the immediate children of an object,
+        anything that is not in bpy.data.objects such as bones will use its own children
+
+        IN:
+            [obj] obj
+
+        OUT:
+            [list] children
+        '''
+        if not isType(obj, bpy.types.Object):
+            return list(getattr(obj, 'children', None) or [])
+
+        self.update()
+        return self.children.get(obj, [])
+
+    def getDescendants(self, obj, depth=None, breadthFirst=False):
+        '''
+        Get all the descendants of an object without recursion
+
+        IN:
+            [obj]  obj
+            [int]  depth, optional, how many levels to go down, default=None for all
+            [bool] breadthFirst, If True will return each level before the next, default=False
+
+        OUT:
+            [list] descendants, depth first unless breadthFirst is True
+        '''
+        def getChildren(item):
+            if isType(item, bpy.types.Object):
+                return self.children.get(item, [])
+
+            return list(getattr(item, 'children', None) or [])
+
+        self.update()
+        results = []
+        pending = deque((child, 1) for child in getChildren(obj))
+        while pending:
+            item, level = pending.popleft()
+            results.append(item)
+            if depth is not None and level >= depth:
+                continue
+
+            children = [(child, level + 1) for child in getChildren(item)]
+            if breadthFirst:
+                pending.extend(children)
+
+            else:
+                pending.extendleft(reversed(children))
+
+        return results
+
+
+HIERARCHY_INDEX = HierarchyIndex()
+
+
 def listRelatives(objects=None,
                   allDecendants=None, ad=None,
                   allParents=None, ap=None,
@@ -989,6 +1745,8 @@ def listRelatives(objects=None,
                   shapes=None, s=None,
                   parents=None, p=None,
                   type=None,
+                  depth=None,
+                  breadthFirst=None, bf=None,
                   *args, **kwargs):
     '''
     Lists objects or shapes related to the specified object(s)
@@ -1000,60 +1758,60 @@ def listRelatives(objects=None,
         [bool] children/c       : Will list immediate children of this node, default=False
         [bool] shapes/s         : Will list any shapes of this object if there is any, default=False
         [bool] parents/p        : Will list any parents of this object if there is any, default=False
-        [bool] type             : Filters the items by type, default=False
+        [str]  type             : Filters the items by type, accepts string or type class, default=None
+        [int]  depth            : Limits how many levels allDecendants/allParents will go, default=None
+        [bool] breadthFirst/bf  : If True allDecendants will list each level before the next, default=False
 
     Out:
         [list] objects
     '''
-    def recursiveGetChildren(obj, results=None):
-        results = results or []
-        children = obj.children
-        if not children:
-            return results
-
-        for child in children:
-            results.append(child)
-            results = recursiveGetChildren(child, results=results)
-
-        return results
-
     allDecendants = parseArgs(allDecendants, ad, False)
     allParents = parseArgs(allParents, ap, False)
     children = parseArgs(children, c, False)
     shapes = parseArgs(shapes, s, False)
     parents = parseArgs(parents, p, False)
+    breadthFirst = parseArgs(breadthFirst, bf, False)
     objects = asObjects(objects, forceObjects=True)
 
     results = []
     for obj in objects:
-        if parents and hasattr(obj, 'parent'):
+        if (parents or allParents) and hasattr(obj, 'parent'):
             if allParents:
-                o = obj
-                while hasattr(o, 'parent'):
-                    parent = o.parent
+                parent = obj.parent
+                level = 1
+                while parent is not None:
                     results.append(parent)
-                    o = parent
+                    if depth is not None and level >= depth:
+                        break
+
+                    parent = getattr(parent, 'parent', None)
+                    level += 1
 
             else:
                 parent = obj.parent
                 if parent:
                     results.append(parent)
 
-        if children and hasattr(obj, 'children'):
+        if (children or allDecendants) and hasattr(obj, 'children'):
             if allDecendants:
-                children = recursiveGetChildren(obj)
+                results += HIERARCHY_INDEX.getDescendants(obj, depth=depth, breadthFirst=breadthFirst)
 
             else:
-                children = obj.children
-
-            if children:
-                results += children
+                results += HIERARCHY_INDEX.getChildren(obj)
 
         if shapes:
             data = obj.data
             if data:
                 results.append(data)
 
+    if type is not None:
+        if isType(type, str):
+            itemType = type.lower()
+            results = [item for item in results if str(getattr(item, 'type', '')).lower() == itemType]
+
+        else:
+            results = [item for item in results if isType(item, type)]
+
     return results
 
 
@@ -1092,6 +1850,7 @@ def listAttr(objects=None,
     internal = parseArgs(internal, i, False)
     results = []
     for obj in objects:
+        driverMap = getDriverMap(obj) if any([settable, keyable]) else dict()
         if not userDefined:
             for realAttr, attr in dict(location='location', rotation_euler='rotation', scale='scale').items():
                 subAttrs = ['{0}{1}'.format(attr, axis) for axis in ['X', 'Y', 'Z']]
@@ -1111,7 +1870,7 @@ def listAttr(objects=None,
                     if (unlocked is True and lockAttr[i] is True):
                         continue
 
-                    if (settable or keyable) and getDriver(obj, subAttr):
+                    if getDriverKey(subAttr) in driverMap:
                         continue
 
                     results.append(subAttr)
@@ -1131,8 +1890,7 @@ def listAttr(objects=None,
                 continue
 
             if any([settable, keyable]):
-                driver = getDriver(obj, attr)
-                if driver:
+                if getDriverKey(attr) in driverMap:
                     continue
 
                 if keyable and type(value) not in [int, float]:
@@ -1194,6 +1952,8 @@ def addDriver(node, attribute, idData=None, dataPath=None, expression=None):
     else:
         driver = node.driver_add(attribute)
 
+    FCURVE_INDEX.invalidate((node.id_data.as_pointer(), 'drivers'))
+
     var = driver.driver.variables.new()
     if idData:
         var.targets[0].id = idData
@@ -1211,9 +1971,87 @@ def addDriver(node, attribute, idData=None, dataPath=None, expression=None):
     return driver
 
 
+class FCurveIndex(object):
+    '''
+    This class is used internally to look up fcurves by attribute without scanning every curve.
+    A map of (attribute, index) to FCurve is cached for each action and each drivers collection, where
+    attribute is the data_path stripped the same way getFCurve compares them.
+    Maps are rebuilt when the scene generation changes and when cmds adds or removes curves, see invalidate.
+    The number of curves is compared as a cheap safety net for curves added or removed directly through bpy,
+    if you remove curves directly through bpy in a script call SceneGeneration.increment()
+
+    IN:
+        [func] generation : optional, function returning the current generation, default=SceneGeneration.get
+    '''
+    def __init__(self, generation=None):
+        self.generation = generation or SceneGeneration.get
+        self.current = None
+        self.items = dict()
+
+    def getMap(self, curves, owner):
+        '''
+        Returns the map of the curves
+
+        IN:
+            [collection] curves : action.fcurves or animation_data.drivers
+            [tuple]      owner  : A hashable key identifying the collection
+
+        OUT:
+            [dict] {(attribute, index): bpy.types.FCurve}
+        '''
+        generation = self.generation()
+        if not generation == self.current:
+            self.items.clear()
+            self.current = generation
+
+        count = len(curves)
+        item = self.items.get(owner)
+        if item is None or not item[0] == count:
+            curveMap = dict()
+            for curve in curves:
+                curveMap.setdefault((reAttribute.sub('', curve.data_path), curve.array_index), curve)
+
+            item = (count, curveMap)
+            self.items[owner] = item
+
+        return item[1]
+
+    def get(self, curves, owner, key):
+        '''
+        Returns the curve matching the key or None
+
+        IN:
+            [collection] curves : action.fcurves or animation_data.drivers
+            [tuple]      owner  : A hashable key identifying the collection
+            [tuple]      key    : (attribute, index)
+
+        OUT:
+            [bpy.types.FCurve] curve
+        '''
+        return self.getMap(curves, owner).get(key)
+
+    def invalidate(self, owner=None):
+        '''
+        Drops the map of the owner, or all of them if the owner is None
+
+        IN:
+            [tuple] owner
+        '''
+        if owner is None:
+            self.items.clear()
+
+        else:
+            self.items.pop(owner, None)
+
+
+FCURVE_INDEX = FCurveIndex()
+
+
 def getFCurve(object, attribute=None, driver=False, createIfNotExists=False):
     '''
     This will return the FCurve for the attribute if it exists
+    When given a Plug the curve is looked up by the plug's owner, data path and index without parsing,
+    so plugs of nested data such as pose bones find their curves too
 
     IN:
         [obj]  object
@@ -1224,22 +2062,22 @@ def getFCurve(object, attribute=None, driver=False, createIfNotExists=False):
     OUT:
         [bpy.types.FCurve] FCurve
     '''
-    def getCurve(data, attribute, index):
-        for item in data:
-            dataPath = reAttribute.sub('', item.data_path)
-            if not dataPath == attribute:
-                continue
-
-            if not item.array_index == index:
-                continue
-
-            return item
-        return None
-
     if isType(object, bpy.types.FCurve):
         return object
 
-    object, attribute = parseObjectAttribute(object, attribute)
+    dataPath = None
+    if isType(object, Plug) and attribute is None:
+        dataPath = object.dataPath
+        stripAttribute, index = (reAttribute.sub('', dataPath), object.index)
+        node, attribute = object
+        object = object.owner
+
+    else:
+        object, attribute = parseObjectAttribute(object, attribute)
+        stripAttribute, index = getAttributeIndex(attribute)
+        node = object
+
+    index = index or 0
 
     if not hasattr(object, 'animation_data'):
         return None
@@ -1247,20 +2085,18 @@ def getFCurve(object, attribute=None, driver=False, createIfNotExists=False):
     data = object.animation_data
     if not data:
         if createIfNotExists and hasattr(object, 'animation_data_create'):
-            object.animation_data_create()
+            data = object.animation_data_create()
 
         else:
             return None
 
-    stripAttribute, index = getAttributeIndex(attribute)
-    index = index or 0
-
+    item = None
     if driver:
-        items = data.drivers
-    else:
-        items = data.action.fcurves
+        item = FCURVE_INDEX.get(data.drivers, (object.as_pointer(), 'drivers'), (stripAttribute, index))
+
+    elif data.action:
+        item = FCURVE_INDEX.get(data.action.fcurves, (data.action.as_pointer(), 'fcurves'), (stripAttribute, index))
 
-    item = getCurve(items, stripAttribute, index)
     if item:
         return item
 
@@ -1268,12 +2104,14 @@ def getFCurve(object, attribute=None, driver=False, createIfNotExists=False):
         return None
 
     if driver:
-        driver = addDriver(object, attribute)
+        driver = addDriver(node, attribute)
         return driver
 
     # To add an empty curve, we must create it with a key, then remove the key
-    object.keyframe_insert(stripAttribute, index)
-    curve = getCurve(object.animation_data.action.fcurves, stripAttribute, index)
+    object.keyframe_insert(dataPath or stripAttribute, index)
+    action = object.animation_data.action
+    FCURVE_INDEX.invalidate((action.as_pointer(), 'fcurves'))
+    curve = FCURVE_INDEX.get(action.fcurves, (action.as_pointer(), 'fcurves'), (stripAttribute, index))
     if not curve:
         return None
 
@@ -1286,7 +2124,7 @@ def getFCurves(data, driver=False, createIfNotExists=False):
     This will return the FCurves for specified data
 
     IN:
-        [obj]  data              : A Dictionary of objectAttributes or other various object inputs
+        [obj]  data              : A PlugTable, a Dictionary of objectAttributes or other various object inputs
         [bool] driver            : If True will get drivers instead of animation curves
         [bool] createIfNotExists : If True will Create the curve if it does not exist
 
@@ -1303,9 +2141,8 @@ def getFCurves(data, driver=False, createIfNotExists=False):
     if curves:
         return curves
 
-    data = parseObjectAttributes(data, listAttrIfEmpty=True, removeNone=True)
-    for obj, attrs in data.items():
-        curves += [getFCurve(obj, attr, driver=driver, createIfNotExists=createIfNotExists) for attr in attrs]
+    for plug in getPlugTable(data).asPlugs(listAttrIfEmpty=True):
+        curves.append(getFCurve(plug, driver=driver, createIfNotExists=createIfNotExists))
 
     return [c for c in curves if c]
 
@@ -1324,6 +2161,39 @@ def getDriver(object, attribute=None):
     return getFCurve(object, attribute, driver=True)
 
 
+def getDriverMap(object):
+    '''
+    This will return all of the drivers on the object in a single pass, keyed the same way as getDriverKey.
+    Use this instead of calling getDriver for many attributes of the same object
+    The map is cached by FCURVE_INDEX so it should not be modified
+
+    IN:
+        [obj] object
+
+    OUT:
+        [dict] {(attribute, index): bpy.types.FCurve}
+    '''
+    data = getattr(object, 'animation_data', None)
+    if not data:
+        return dict()
+
+    return FCURVE_INDEX.getMap(data.drivers, (object.as_pointer(), 'drivers'))
+
+
+def getDriverKey(attribute):
+    '''
+    This will return the key of the attribute in getDriverMap
+
+    IN:
+        [str] attribute
+
+    OUT:
+        [tuple] (attribute, index)
+    '''
+    attribute, index = getAttributeIndex(attribute)
+    return (attribute, index or 0)
+
+
 def getDriverInfo(driver):
     '''
     This will return the info for the specified driver
@@ -1478,18 +2348,79 @@ def getAttributeIndex(attribute):
     if not isType(attribute, [str]):
         raise RuntimeError('{0} is not a string'.format(attribute))
 
-    attribute = resolveAttributeName(attribute)
+    if '.' in attribute:
+        attribute = resolveAttributeName(attribute)
+
+    return resolveAttributeIndex(attribute)
+
+
+@functools.lru_cache(maxsize=8192)
+def resolveAttributeIndex(attribute):
+    '''
+    This is the memoized core of getAttributeIndex, it only handles attribute names without an object.
+    Returns the canonical attribute and index in one lookup, for example
+    tx returns (location, 0)
+    ry returns (rotation_euler, 1)
+    prop returns (prop, None)
+
+    IN:
+        [str] attribute
+
+    OUT:
+        [tuple] (attribute, index)
+    '''
+    attribute = resolveAttributeString(attribute)
     if re.match('rotation[XYZW]', attribute):
         attribute = attribute.replace('rotation', 'rotation_euler')
 
     indices = CONSTANTS.attributeIndices
-    char = attribute[-1]
+    char = attribute[-1:]
     if char in indices.keys():
         attribute = attribute[:-1]
 
     return (attribute, indices.get(char))
 
 
+@functools.lru_cache(maxsize=8192)
+def resolveAttributeString(attribute):
+    '''
+    This is the memoized core of resolveAttributeName, it only handles attribute names without an object.
+    translateX becomes locationX
+    location[0] becomes locationX
+    ry becomes rotationY
+
+    IN:
+        [str] attribute
+
+    OUT:
+        [str] attribute
+    '''
+    # Check if the index has been passed in in list form
+    listIndexMatch = re.findall('([A-Za-z0-9_\-\.]*)\[([0-9]*)\]', attribute)
+    if listIndexMatch:
+        attribute, index = listIndexMatch[0]
+        attribute = '{0}{1}'.format(attribute, CONSTANTS.attributeIndicesInverse[int(index)])
+
+    else:
+        attribute = reAttribute.sub('', attribute)
+
+    return CONSTANTS.attributeAliases.get(attribute, attribute)
+
+
+def registerAttributeAlias(alias, attribute):
+    '''
+    Registers an alias so that it will resolve to the attribute, for example
+    registerAttributeAlias('weight', 'influence')
+
+    IN:
+        [str] alias
+        [str] attribute
+    '''
+    CONSTANTS.attributeAliases[alias] = attribute
+    resolveAttributeString.cache_clear()
+    resolveAttributeIndex.cache_clear()
+
+
 def resolveAttributeName(attribute, object=None):
     '''
     Given an attribute name it will resolve it into something that can be used by the cmds module.
@@ -1511,6 +2442,9 @@ def resolveAttributeName(attribute, object=None):
     if not attribute:
         return None
 
+    if isType(attribute, Plug):
+        return attribute.attribute
+
     if object is None and isType(attribute, str) and '.' in attribute:
         object, attribute = attribute.rsplit('.', 1)
 
@@ -1533,20 +2467,7 @@ def resolveAttributeName(attribute, object=None):
     if object and attribute in object.keys():
         return attribute
 
-    # Check if the index has been passed in in list form
-    listIndexMatch = re.findall('([A-Za-z0-9_\-\.]*)\[([0-9]*)\]', attribute)
-    if listIndexMatch:
-        attribute, index = listIndexMatch[0]
-        attribute = '{0}{1}'.format(attribute, CONSTANTS.attributeIndicesInverse[int(index)])
-
-    else:
-        attribute = reAttribute.sub('', attribute)
-
-    for key, values in CONSTANTS.attributeConversion.items():
-        if attribute in values:
-            return key
-
-    return attribute
+    return resolveAttributeString(attribute)
 
 
 def resolveAttributeNames(attributes, object=None, transforms=False):
@@ -1585,6 +2506,9 @@ def parseObjectAttribute(object, attribute=None):
     OUT:
         [tuple] (object, attribute)
     '''
+    if isType(object, Plug):
+        return (object.object, object.attribute)
+
     if not any([object, attribute]):
         raise RuntimeError('Could not parseObjectAttribute({0}, {1})'.format(object, attribute))
 
@@ -1626,6 +2550,274 @@ def parseObjectAttribute(object, attribute=None):
     raise RuntimeError('Could not parseObjectAttribute({0}, {1})'.format(object, attribute))
 
 
+class Plug(object):
+    '''
+    This class holds a resolved (object, attribute) pair so it can be passed between commands without being
+    parsed again. The canonical attribute, it's array index, the ID that owns the animation data and the
+    rna data path from that ID are resolved once when the plug is created.
+    Plugs are hashable and can be unpacked like a tuple
+    All cmds functions that accept (object, attribute) inputs accept plugs
+
+    Usage:
+        plug = Plug('Cube', 'tx')
+        plug.attribute, plug.name, plug.index, plug.owner, plug.dataPath
+        # 'locationX', 'location', 0, bpy.data.objects['Cube'], 'location'
+        object, attribute = plug
+
+    IN:
+        [obj] object
+        [str] attribute
+    '''
+    __slots__ = ['object', 'attribute', 'name', 'index', 'owner', 'dataPath', 'key', 'hash']
+
+    def __init__(self, object, attribute=None):
+        object, attribute = parseObjectAttribute(object, attribute)
+        if object is None or not attribute:
+            raise RuntimeError('invalid inputs: Plug({0}, {1})'.format(object, attribute))
+
+        self.object = object
+        self.attribute = attribute
+        self.name, self.index = getAttributeIndex(attribute)
+
+        if hasattr(object, 'keys') and attribute in object.keys():
+            self.name, self.index = (attribute, None)
+            self.dataPath = '["{0}"]'.format(attribute)
+
+        else:
+            self.dataPath = self.name
+
+        self.owner = getattr(object, 'id_data', None) or object
+        if not isType(object, bpy.types.ID) and hasattr(object, 'path_from_id'):
+            try:
+                self.dataPath = object.path_from_id(self.dataPath)
+
+            except ValueError:
+                self.owner = object
+
+        self.key = (object.as_pointer() if hasattr(object, 'as_pointer') else id(object), attribute)
+        self.hash = hash(self.key)
+
+    def __hash__(self):
+        return self.hash
+
+    def __eq__(self, other):
+        return isType(other, Plug) and self.key == other.key
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __iter__(self):
+        return iter((self.object, self.attribute))
+
+    def __repr__(self):
+        return 'Plug({0})'.format(self.asString())
+
+    def asString(self):
+        '''
+        Returns the plug as an 'object.attribute' string
+        '''
+        return '{0}.{1}'.format(getattr(self.object, 'name', self.object), self.attribute)
+
+
+class PlugTable(object):
+    '''
+    This class holds a flat table of plugs, one row per (object, attribute) in parallel columns.
+    objects holds the objects, attributes the interned attribute names and indices the array index of
+    each attribute, an object specified without any attributes has a row with attribute None.
+    plugs holds the Plug of each row, it is filled in when a Plug is added or by asPlugs.
+    Use getPlugTable to build one from any input supported by parseObjectAttributes,
+    the key commands such as getFCurves, copyKey, pasteKey, setKeyframe and scaleKey accept a table directly.
+    '''
+    def __init__(self):
+        self.objects = []
+        self.attributes = []
+        self.indices = []
+        self.plugs = []
+
+    def __len__(self):
+        return len(self.objects)
+
+    def __iter__(self):
+        return zip(self.objects, self.attributes, self.indices)
+
+    def add(self, object, attribute=None):
+        '''
+        Adds a row to the table
+
+        IN:
+            [obj] object
+            [str] attribute, optional
+        '''
+        index = None
+        if isType(attribute, [str]):
+            attribute = sys.intern(attribute)
+            index = resolveAttributeIndex(attribute)[1]
+
+        self.objects.append(object)
+        self.attributes.append(attribute)
+        self.indices.append(index)
+        self.plugs.append(None)
+
+    def addPlug(self, plug):
+        '''
+        Adds a Plug to the table without parsing it again
+
+        IN:
+            [Plug] plug
+        '''
+        self.objects.append(plug.object)
+        self.attributes.append(plug.attribute)
+        self.indices.append(plug.index)
+        self.plugs.append(plug)
+
+    def asPlugs(self, listAttrIfEmpty=False):
+        '''
+        Returns the rows with attributes as a list of unique Plugs in table order,
+        Plugs that were added to the table are returned as they are
+
+        IN:
+            [bool] listAttrIfEmpty, If True objects without attributes will use listAttr
+
+        OUT:
+            [list] plugs
+        '''
+        results = []
+        seen = set()
+        keyed = set(object for object, attribute in zip(self.objects, self.attributes) if attribute is not None)
+        for row, (object, attribute) in enumerate(zip(self.objects, self.attributes)):
+            if attribute is None:
+                if not listAttrIfEmpty or object in keyed:
+                    continue
+
+                keyed.add(object)
+                plugs = [Plug(object, attr) for attr in listAttr(object)]
+
+            else:
+                if self.plugs[row] is None:
+                    self.plugs[row] = Plug(object, attribute)
+
+                plugs = [self.plugs[row]]
+
+            for plug in plugs:
+                if plug not in seen:
+                    seen.add(plug)
+                    results.append(plug)
+
+        return results
+
+    def asDict(self, listAttrIfEmpty=False, removeNone=False):
+        '''
+        Returns the table in the form of parseObjectAttributes
+
+        IN:
+            [bool] listAttrIfEmpty, If True objects without attributes will use listAttr
+            [bool] removeNone,      If True objects with attributes of None will be removed,
+                                    objects without attributes are given an empty list so none are removed
+
+        OUT:
+            [dict] dict(object=attributes)
+        '''
+        results = od()
+        for object, attribute in zip(self.objects, self.attributes):
+            attributes = results.setdefault(object, [])
+            if attribute is not None and attribute not in attributes:
+                attributes.append(attribute)
+
+        for object, attributes in list(results.items()):
+            if removeNone and attributes is None:
+                del results[object]
+
+            elif listAttrIfEmpty and not attributes:
+                results[object] = listAttr(object)
+
+        return results
+
+
+def getPlugTable(object, attributes=None):
+    '''
+    Normalizes any input supported by parseObjectAttributes into a PlugTable in a single non recursive pass
+    A PlugTable is returned as it is
+    valid inputs:
+        object=object, attributes=[attributes]
+        object='object.attribute', attributes=None
+        object=(object, [attributes]), attributes=None
+        object=[(object, attribute), (object, attribute)]
+        object=dict(object=[attributes])
+
+    IN:
+        [input] object
+        [list]  attributes
+
+    OUT:
+        [PlugTable] table
+    '''
+    if isType(object, PlugTable) and not attributes:
+        return object
+
+    table = PlugTable()
+    stack = [(object, attributes)]
+    while stack:
+        object, attributes = stack.pop()
+        if isType(object, Plug):
+            table.addPlug(object)
+            continue
+
+        if not any([object, attributes]):
+            continue
+
+        if attributes:
+            attributes = asList(attributes)
+            if isType(object, [str]):
+                if '.' in object:
+                    o, a = object.rsplit('.', 1)
+                    if not re.match('[0-9].*', a):
+                        object = o
+
+            elif isType(object, [list, tuple]):
+                stack.extend((item, attributes) for item in reversed(object))
+                continue
+
+            elif isType(object, [dict]):
+                # No logical way to process this
+                raise RuntimeError('Could not getPlugTable({0}, {1})'.format(object, attributes))
+
+            object = asObject(object)
+            if object is None:
+                continue
+
+            for attribute in attributes:
+                table.add(object, attribute)
+
+            continue
+
+        if isType(object, [str]):
+            object, attribute = parseObjectAttribute(object, None)
+            if object is not None:
+                table.add(object, attribute)
+
+        elif isType(object, [list]):
+            stack.extend((item, None) for item in reversed(object))
+
+        elif isType(object, [tuple]):
+            if len(object) == 2:
+                stack.append((object[0], object[1]))
+
+            else:
+                stack.extend((item, None) for item in reversed(object))
+
+        elif isType(object, [dict]):
+            stack.extend(reversed(list(object.items())))
+
+        else:
+            node = asObject(object)
+            if node is None:
+                raise RuntimeError('Could not getPlugTable({0}, {1})'.format(object, attributes))
+
+            table.add(node)
+
+    return table
+
+
 def parseObjectAttributes(object, attributes=None, listAttrIfEmpty=False, removeNone=False):
     '''
     Like parseObjectAttribute but will return a dictionary of dict(object=attributes)
@@ -1644,121 +2836,253 @@ def parseObjectAttributes(object, attributes=None, listAttrIfEmpty=False, remove
     OUT:
         [dict]  dict(object=attributes)
     '''
-    def parseResults(results, listAttrIfEmpty=False, removeNone=False):
-        items = dict()
-        for obj, attrs in results.items():
-            if removeNone and attrs is None:
-                continue
+    return getPlugTable(object, attributes).asDict(listAttrIfEmpty, removeNone)
 
-            if listAttrIfEmpty and attrs is not None and not attrs:
-                items[obj] = listAttr(obj)
-                continue
 
-            items[obj] = asList(attrs)
+def getAttributePointer(object, attribute=None):
+    '''
+    This is used internally to store pointers to blenders custom attributes
 
-        return items
+    Required Parameters:
+        [obj] object        : The object to operate on
+        [str] attribute     : The attribute to query
 
-    results = dict()
-    if not any([object, attributes]):
-        return results
+    Out:
+        [Ptr] pointer
+    '''
+    if attribute is None:
+        attribute = resolveAttributeName(object)
 
-    # Check if correct inputs already passed
-    if attributes:
-        attributes = asList(attributes)
-        if isType(object, [str]):
-            if '.' in object:
-                o, a = object.rsplit('.', 1)
-                if not re.match('[0-9].*', a):
-                    object = o
+    else:
+        attribute = resolveAttributeName(attribute, object=object)
 
-            object = asObject(object)
-            results = {object: attributes}
-            return parseResults(results, listAttrIfEmpty, removeNone)
+    if isType(attribute, [list, tuple]):
+        raise RuntimeError('getAttributePointer does not support multiple attributes')
+
+    if attribute in CONSTANTS.coreAttributes:
+        return Ptr(object, attribute)
+
+    if attribute in CONSTANTS.transformAttributes:
+        attr, index = getAttributeIndex(attribute)
+        return Ptr(object, attr, index)
+
+    if attribute in object.keys():
+        return Ptr(object, attribute)
+
+    return None
+
+
+def getAttrAtTimes(object, attribute, times, evaluate=True, worldspace=False):
+    '''
+    Returns the values of an attribute at many times.
+    When the attribute is keyed and the fcurve alone defines its value, the fcurve is evaluated directly
+    and the scene frame is never changed. When nothing can animate the attribute it is read once.
+    Driven or constrained channels, worldspace or parented transforms, rotations that are not in XYZ order
+    and anything driven by the nla fall back to stepping the scene frame, which is restored afterwards.
+
+    IN:
+        [obj]   object
+        [str]   attribute  : The resolved attribute name
+        [list]  times
+        [bool]  evaluate   : If True transform attributes include constraints, default=True
+        [bool]  worldspace : If True transform attributes are read in worldspace, default=False
+
+    OUT:
+        [numpy.ndarray] values
+    '''
+    times = numpy.atleast_1d(numpy.asarray(times, dtype=float))
+    curve = None
+    animData = getattr(object, 'animation_data', None)
+    driverMap = getDriverMap(object)
+    driven = getDriverKey(attribute) in driverMap
+    nla = bool(animData) and any(not track.mute for track in animData.nla_tracks)
+    if animData and animData.action:
+        curve = getFCurve(object, attribute)
+
+    if curve is not None and not len(curve.keyframe_points) and not len(curve.modifiers):
+        curve = None
+
+    if curve is None and not driven and not nla:
+        static = True
+        if evaluate and attribute in CONSTANTS.transformChannels:
+            # Any other animated channel or constraint may change the decomposed matrix
+            static = not (animData and animData.action and len(animData.action.fcurves)) and \
+                not driverMap and not len(getattr(object, 'constraints', [])) and \
+                not (worldspace and getattr(object, 'parent', None))
+
+        if static:
+            value = getAttr(object, attribute, evaluate=evaluate, worldspace=worldspace)
+            return numpy.array([value] * len(times))
+
+    if driven or nla:
+        curve = None
+
+    if curve and evaluate and attribute in CONSTANTS.transformChannels:
+        attr, index = getAttributeIndex(attribute)
+        identity = numpy.eye(4)
+        if len(getattr(object, 'constraints', [])) or \
+                not getattr(object, 'rotation_mode', 'XYZ') == 'XYZ' or \
+                any(getattr(object, 'delta_{0}'.format(attr), [0.0, 0.0, 0.0])) or \
+                getattr(object, 'parent', None) and \
+                (worldspace or not numpy.allclose(numpy.array(object.matrix_parent_inverse), identity)):
+            curve = None
+
+    if curve:
+        return numpy.array([curve.evaluate(time) for time in times])
+
+    scene = bpy.context.scene
+    frame = scene.frame_current
+    subframe = scene.frame_subframe
+    results = []
+    try:
+        for time in times:
+            timeFrame = int(math.floor(time))
+            scene.frame_set(timeFrame, subframe=float(time - timeFrame))
+            results.append(getAttr(object, attribute, evaluate=evaluate, worldspace=worldspace))
+
+    finally:
+        scene.frame_set(frame, subframe=subframe)
+
+    return numpy.array(results)
+
+
+class AttributeHandle(object):
+    '''
+    This class holds a resolved attribute so it can be read and written repeatedly without
+    parsing the object, attribute name, pointer or driver each time.
+    The getter and setter are bound when the handle is created, use getAttributeHandle to create one.
+    set checks the attribute's drivers on every call and returns False without setting a driven attribute.
+
+    Usage:
+        handle = getAttributeHandle(obj, 'tx')
+        value = handle.get()
+        handle.set(value + 1)
+        values = handle.getMany([1, 2, 3])
+
+    IN:
+        [obj]  object
+        [str]  attribute  : The resolved attribute name
+        [bool] evaluate   : If True transform attributes include constraints, default=True
+        [bool] worldspace : If True transform attributes are read in worldspace, default=False
+    '''
+    __slots__ = ['object', 'attribute', 'name', 'index', 'evaluate', 'worldspace', 'driverKey', 'get', 'set']
+
+    def __init__(self, object, attribute, evaluate=True, worldspace=False):
+        self.object = object
+        self.attribute = attribute
+        self.name, self.index = getAttributeIndex(attribute)
+        self.evaluate = evaluate
+        self.worldspace = worldspace
+        self.driverKey = getDriverKey(attribute)
+        self.get, self.set = self.bind()
+
+    def __repr__(self):
+        return 'AttributeHandle({0}.{1})'.format(getattr(self.object, 'name', self.object), self.attribute)
+
+    def isDriven(self):
+        '''
+        Returns True if the attribute is currently driven
+        '''
+        return self.driverKey in getDriverMap(self.object)
 
-        if isType(object, [list, tuple]):
-            for item in object:
-                results.update(parseObjectAttributes(item, attributes))
+    def bind(self):
+        '''
+        Returns the (getter, setter) functions for this attribute
+        '''
+        object = self.object
+        attribute = self.attribute
+        name = self.name
+        index = self.index
+        isDriven = self.isDriven
 
-            return parseResults(results, listAttrIfEmpty, removeNone)
+        if attribute in object.keys():
+            def getter():
+                return object.get(attribute)
 
-        if isType(object, [dict]):
-            # No logical way to process this
-            raise RuntimeError('Could not parseObjectAttributes({0}, {1})'.format(object, attributes))
+            def setter(value):
+                object[attribute] = value
+                return True
 
-        object = asObject(object)
-        if object:
-            results = {object: attributes}
+        elif attribute in CONSTANTS.transformChannels:
+            if self.evaluate:
+                worldspace = self.worldspace
 
-        return parseResults(results, listAttrIfEmpty, removeNone)
+                def getter():
+                    return DECOMPOSITION_CACHE.get(object, worldspace)[name][index]
 
-    # attributes is None at this point
-    # If object is not in str, list, tuple, dict, it cannot be parsed
-    if isType(object, [str]):
-        object, attribute = parseObjectAttribute(object, None)
-        results = {object: asList(attribute, skipNoneType=True)}
-        results = parseResults(results, listAttrIfEmpty, removeNone)
-        return results
+            else:
+                def getter():
+                    return getattr(object, name)[index]
 
-    if isType(object, [list]):
-        for item in object:
-            results.update(parseObjectAttributes(item, None))
+            def setter(value):
+                getattr(object, name)[index] = value
+                SceneGeneration.incrementEvaluation()
+                return True
 
-        return parseResults(results, listAttrIfEmpty, removeNone)
+        elif attribute in CONSTANTS.coreAttributes:
+            def getter():
+                return getattr(object, attribute)
 
-    if isType(object, [tuple]):
-        if len(object) == 2:
-            results.update(parseObjectAttributes(object[0], object[1]))
+            def setter(value):
+                setattr(object, attribute, value)
+                return True
 
         else:
-            for item in object:
-                results.update(parseObjectAttributes(item, None))
+            raise RuntimeError('Could not locate attribute {0}.{1}'.format(getattr(object, 'name', object), attribute))
 
-        return parseResults(results, listAttrIfEmpty, removeNone)
+        def checkedSetter(value):
+            if isDriven():
+                return False
 
-    if isType(object, [dict]):
-        for key, value in object.items():
-            results.update(parseObjectAttributes(key, value))
+            return setter(value)
+
+        return (getter, checkedSetter)
 
-        return parseResults(results, listAttrIfEmpty, removeNone)
+    def getMany(self, times):
+        '''
+        Get the value at each of the times, see getAttrAtTimes
 
-    node = asObject(object)
-    if node:
-        return parseResults({node: []}, listAttrIfEmpty, removeNone)
+        IN:
+            [list] times
 
-    raise RuntimeError('Could not parseObjectAttributes({0}, {1})'.format(object, attributes))
+        OUT:
+            [numpy.ndarray] values
+        '''
+        return getAttrAtTimes(self.object, self.attribute, times, evaluate=self.evaluate, worldspace=self.worldspace)
 
 
-def getAttributePointer(object, attribute=None):
+def getAttributeHandle(object,
+                       attribute=None, at=None,
+                       evaluate=None, e=None,
+                       worldspace=None, ws=None,
+                       *args, **kwargs):
     '''
-    This is used internally to store pointers to blenders custom attributes
+    Returns an AttributeHandle, this is a resolved attribute that can be read and written in tight loops
+    without the overhead of getAttr and setAttr. Inputs are the same as getAttr.
 
     Required Parameters:
         [obj] object        : The object to operate on
-        [str] attribute     : The attribute to query
+        [str] attribute/at  : The attribute to query
+
+    Optional Parameters:
+        [bool]  evaluate/e     : If True will return the calculated value including constraints, default=True
+        [bool]  worldspace/ws  : If True will return the value in worldspace, default=False
 
     Out:
-        [Ptr] pointer
+        [AttributeHandle] handle
     '''
-    if attribute is None:
-        attribute = resolveAttributeName(object)
+    attribute = parseArgs(attribute, at, None)
+    evaluate = parseArgs(evaluate, e, True)
+    worldspace = parseArgs(worldspace, ws, False)
 
-    else:
-        attribute = resolveAttributeName(attribute, object=object)
+    object, attribute = parseObjectAttribute(object, attribute)
+    if not all([object, attribute]):
+        raise RuntimeError('invalid inputs: getAttributeHandle({0}, {1})'.format(object, attribute))
 
     if isType(attribute, [list, tuple]):
-        raise RuntimeError('getAttributePointer does not support multiple attributes')
+        raise RuntimeError('getAttributeHandle does not support multiple attributes')
 
-    if attribute in CONSTANTS.coreAttributes:
-        return Ptr(object, attribute)
-
-    if attribute in CONSTANTS.transformAttributes:
-        attr, index = getAttributeIndex(attribute)
-        return Ptr(object, attr, index)
-
-    if attribute in object.keys():
-        return Ptr(object, attribute)
-
-    return None
+    return AttributeHandle(object, attribute, evaluate=evaluate, worldspace=worldspace)
 
 
 def getAttr(object,
@@ -1782,7 +3106,7 @@ def getAttr(object,
         [bool]  keyable/k      : Get the keyable state of the attribute
         [bool]  lock/l         : Get the locked state of the attribute
         [bool]  settable/s     : Get the settable state of the attribute
-        [float] time/t         : Get the value at the specified time
+        [float] time/t         : Get the value at the specified time, a list of times returns an array of values
         [bool]  type           : If True will return the type of attribute
         [bool]  evaluate/e     : If True will return the calculated value including constraints, default=True
                                : This is only useful for transform attributes
@@ -1801,20 +3125,31 @@ def getAttr(object,
     worldspace = parseArgs(worldspace, ws, False)
     result = None
 
-    if isType(object, str) and '.' in object:
-        object, attribute = object.rsplit('.', 1)
+    if isType(object, Plug):
+        object, attribute = object
 
-    object = asObject(object)
+    else:
+        if isType(object, str) and '.' in object:
+            object, attribute = object.rsplit('.', 1)
 
-    if attribute is None:
-        attribute = resolveAttributeName(object)
+        object = asObject(object)
 
-    else:
-        attribute = resolveAttributeName(attribute, object=object)
+        if attribute is None:
+            attribute = resolveAttributeName(object)
+
+        else:
+            attribute = resolveAttributeName(attribute, object=object)
 
     if isType(attribute, [list, tuple]):
         raise RuntimeError('getAttr does not support multiple attributes')
 
+    if time is not None and not any([lock, settable, keyable, type]):
+        values = getAttrAtTimes(object, attribute, time, evaluate=evaluate, worldspace=worldspace)
+        if isType(time, [list, tuple, numpy.ndarray]):
+            return values
+
+        return values[0]
+
     if lock:
         if not attribute in CONSTANTS.transformAttributes:
             return False
@@ -1834,17 +3169,11 @@ def getAttr(object,
 
     if attribute in CONSTANTS.transformAttributes:
         if any([settable, keyable]):
-            return bool(getDriver(object, attribute) is None)
+            return getDriverKey(attribute) not in getDriverMap(object)
 
         attr, index = getAttributeIndex(attribute)
         if evaluate:
-            if worldspace:
-                matrix = object.matrix_world
-
-            else:
-                matrix = object.matrix_local
-
-            vector = getattr(matrix, CONSTANTS.matrixTransformAttrConversion.get(attr))()
+            vector = DECOMPOSITION_CACHE.get(object, worldspace)[attr]
 
         else:
             vector = getattr(object, attr)
@@ -1866,6 +3195,94 @@ def getAttr(object,
     return result
 
 
+def getAttrs(objects,
+             attributes=None, at=None,
+             evaluate=None, e=None,
+             worldspace=None, ws=None,
+             *args, **kwargs):
+    '''
+    Queries the values of many attributes on many objects at once, this is the bulk version of getAttr.
+    Each transform matrix is decomposed once per object rather than once per channel and when reading
+    the raw channels of most of the scene they are read with foreach_get.
+    Values that cannot be read as a float are returned as nan.
+
+    Common Usage:
+        getAttrs(ls(sl=True), ['tx', 'ty', 'tz', 'rx', 'ry', 'rz', 'sx', 'sy', 'sz'])
+
+    Required Parameters:
+        [list] objects        : The objects to operate on
+        [list] attributes/at  : The attributes to query
+
+    Optional Parameters:
+        [bool]  evaluate/e     : If True will return the calculated value including constraints, default=True
+                               : This is only useful for transform attributes
+        [bool]  worldspace/ws  : If True will return the value in worldspace, default=False
+                               : This is only useful for transform attributes
+
+    Out:
+        [numpy.ndarray] values : float array of shape (objects, attributes)
+    '''
+    attributes = asList(parseArgs(attributes, at, None))
+    evaluate = parseArgs(evaluate, e, True)
+    worldspace = parseArgs(worldspace, ws, False)
+
+    objects = asObjects(objects)
+    results = numpy.full((len(objects), len(attributes)), numpy.nan)
+    if not objects or not attributes:
+        return results
+
+    resolved = [resolveAttributeName(attribute) for attribute in attributes]
+    indices = [getAttributeIndex(attribute) if attribute in CONSTANTS.transformChannels else (None, None)
+               for attribute in resolved]
+    vectorNames = set(attr for attr, index in indices if attr)
+
+    rawVectors = dict()
+    if vectorNames and not evaluate:
+        collection = bpy.data.objects
+        if len(objects) * 2 >= len(collection) and all(isType(obj, bpy.types.Object) for obj in objects):
+            positions = dict((obj.as_pointer(), i) for i, obj in enumerate(collection))
+            rows = [positions.get(obj.as_pointer()) for obj in objects]
+            if None not in rows:
+                for attr in vectorNames:
+                    buffer = numpy.empty(len(collection) * 3, dtype=numpy.float32)
+                    collection.foreach_get(attr, buffer)
+                    rawVectors[attr] = buffer.reshape(-1, 3)[rows]
+
+    for row, obj in enumerate(objects):
+        keys = obj.keys() if hasattr(obj, 'keys') else []
+        vectors = dict()
+        if vectorNames and rawVectors:
+            vectors = dict((attr, rawVectors[attr][row]) for attr in vectorNames)
+
+        elif vectorNames and evaluate:
+            vectors = DECOMPOSITION_CACHE.get(obj, worldspace)
+
+        elif vectorNames:
+            vectors = dict((attr, getattr(obj, attr)) for attr in vectorNames)
+
+        for column, attribute in enumerate(attributes):
+            if attribute in keys:
+                value = obj.get(attribute)
+
+            elif indices[column][0]:
+                attr, index = indices[column]
+                value = vectors[attr][index]
+
+            elif resolved[column] in CONSTANTS.coreAttributes:
+                value = getattr(obj, resolved[column])
+
+            elif resolved[column] in keys:
+                value = obj.get(resolved[column])
+
+            else:
+                continue
+
+            if isType(value, [int, float, bool, numpy.number]):
+                results[row, column] = value
+
+    return results
+
+
 def setAttr(object,
             attribute=None,
             value=None, v=None,
@@ -1891,19 +3308,26 @@ def setAttr(object,
     value = parseArgs(value, v, None)
     lock = parseArgs(lock, l, None)
 
-    if isType(object, str) and '.' in object:
+    if isType(object, Plug):
         if value is None:
             value = attribute
 
-        object, attribute = object.rsplit('.', 1)
+        object, attribute = object
+
+    else:
+        if isType(object, str) and '.' in object:
+            if value is None:
+                value = attribute
 
-    object = asObject(object)
+            object, attribute = object.rsplit('.', 1)
 
-    if attribute is None:
-        attribute = resolveAttributeName(object)
+        object = asObject(object)
 
-    else:
-        attribute = resolveAttributeName(attribute, object=object)
+        if attribute is None:
+            attribute = resolveAttributeName(object)
+
+        else:
+            attribute = resolveAttributeName(attribute, object=object)
 
     if isType(attribute, [list, tuple]):
         raise RuntimeError('getAttr does not support multiple attributes')
@@ -1917,7 +3341,7 @@ def setAttr(object,
         lockAttr[index] = lock
         return True
 
-    if getDriver(object, attribute):
+    if getDriverKey(attribute) in getDriverMap(object):
         return False
 
     ptr = getAttributePointer(object, attribute)
@@ -1926,9 +3350,307 @@ def setAttr(object,
         raise RuntimeError('Could not locate attribute {0}.{1}'.format(object.name, attribute))
 
     ptr.set(value)
+    SceneGeneration.incrementEvaluation()
     return True
 
 
+def setAttrs(objects,
+             attributes=None, at=None,
+             values=None, v=None,
+             *args, **kwargs):
+    '''
+    Sets the values of many attributes on many objects at once, this is the bulk version of setAttr.
+    Attribute names are resolved once and the driven and locked state of each channel is checked once per
+    object, driven or locked channels are skipped. Transform channels are written as whole vectors, when
+    writing to every object in the file they are written with a single foreach_set per vector.
+    Only the targeted objects are written and each of them is tagged for a depsgraph update.
+
+    Common Usage:
+        setAttrs(objects, ['tx', 'ty', 'tz'], values)
+
+    Required Parameters:
+        [list]  objects        : The objects to operate on
+        [list]  attributes/at  : The attributes to set
+        [array] values/v       : The values of shape (objects, attributes), a single row is set on every object
+
+    Out:
+        [numpy.ndarray] written : bool array of shape (objects, attributes), True where a value was set
+    '''
+    attributes = asList(parseArgs(attributes, at, None))
+    values = parseArgs(values, v, None)
+
+    objects = asObjects(objects)
+    shape = (len(objects), len(attributes))
+    written = numpy.zeros(shape, dtype=bool)
+    if not objects or not attributes:
+        return written
+
+    values = numpy.asarray(values, dtype=float)
+    if values.ndim == 1:
+        values = numpy.broadcast_to(values, shape)
+
+    if not values.shape == shape:
+        raise RuntimeError('setAttrs values must be of shape {0}, not {1}'.format(shape, values.shape))
+
+    resolved = [resolveAttributeName(attribute) for attribute in attributes]
+    indices = [getAttributeIndex(attribute) if attribute in CONSTANTS.transformChannels else (None, None)
+               for attribute in resolved]
+    vectorNames = sorted(set(attr for attr, index in indices if attr))
+
+    collection = bpy.data.objects
+    buffers = dict()
+    rows = None
+    # foreach_set writes the whole collection, so it is only used when every object is a target
+    if vectorNames and len(objects) >= len(collection) and \
+            all(isType(obj, bpy.types.Object) and not obj.library for obj in objects):
+        positions = dict((obj.as_pointer(), i) for i, obj in enumerate(collection))
+        rows = [positions.get(obj.as_pointer()) for obj in objects]
+        if None in rows or not len(set(rows)) == len(collection):
+            rows = None
+
+        else:
+            for attr in vectorNames:
+                buffer = numpy.empty(len(collection) * 3, dtype=numpy.float32)
+                collection.foreach_get(attr, buffer)
+                buffers[attr] = buffer.reshape(-1, 3)
+
+    for row, obj in enumerate(objects):
+        keys = obj.keys() if hasattr(obj, 'keys') else []
+        driven = getDriverMap(obj)
+        vectors = dict()
+
+        for column, attribute in enumerate(attributes):
+            value = values[row, column]
+            if numpy.isnan(value):
+                continue
+
+            if attribute in keys or (not indices[column][0] and resolved[column] in keys):
+                name = attribute if attribute in keys else resolved[column]
+                if getDriverKey(name) in driven:
+                    continue
+
+                current = obj.get(name)
+                if isType(current, [bool, int, float]):
+                    value = type(current)(value)
+
+                obj[name] = value
+
+            elif indices[column][0]:
+                attr, index = indices[column]
+                lockAttr = getattr(obj, 'lock_{0}'.format(attr.replace('_euler', '')), [False] * 3)
+                if (attr, index) in driven or lockAttr[index]:
+                    continue
+
+                if rows is not None:
+                    buffers[attr][rows[row], index] = value
+
+                else:
+                    if attr not in vectors:
+                        vectors[attr] = list(getattr(obj, attr))
+
+                    vectors[attr][index] = value
+
+            elif resolved[column] in CONSTANTS.coreAttributes:
+                name = resolved[column]
+                if getDriverKey(name) in driven:
+                    continue
+
+                current = getattr(obj, name)
+                if isType(current, [bool, int]):
+                    value = type(current)(value)
+
+                setattr(obj, name, value)
+
+            else:
+                continue
+
+            written[row, column] = True
+
+        for attr, vector in vectors.items():
+            setattr(obj, attr, vector)
+
+    for attr, buffer in buffers.items():
+        collection.foreach_set(attr, buffer.ravel())
+
+    for row in numpy.flatnonzero(written.any(axis=1)):
+        if hasattr(objects[row], 'update_tag'):
+            objects[row].update_tag()
+
+    SceneGeneration.incrementEvaluation()
+    return written
+
+
+class AttributeSchema(object):
+    '''
+    This class holds an in memory schema of the custom attributes on an object.
+    It is backed by the object's _RNA_UI ID property so it is saved with the file, but queries only touch
+    the ID properties when the schema is first read. addAttr, addAttrs and deleteAttr write through the schema
+    and schemas are dropped when the scene generation changes, see AttributeSchemaCache.
+    If you add or remove custom attributes directly through bpy in a script call SceneGeneration.increment()
+    Each attribute is stored as dict(name, type, default, min, max, keyable)
+
+    IN:
+        [obj] object
+    '''
+    defaultTypes = dict(int=0, float=0.0, string='', vector=(0.0, 0.0, 0.0, 0.0))
+
+    def __init__(self, object):
+        self.object = object
+        self.items = dict()
+        self.load()
+
+    def load(self):
+        '''
+        Reads every custom attribute and it's _RNA_UI settings from the object
+        '''
+        self.items.clear()
+        rnaUI = self.readRnaUI()
+        for name, value in self.object.items():
+            if name == '_RNA_UI':
+                continue
+
+            self.items[name] = self.createItem(name, value, rnaUI.get(name))
+
+    def readRnaUI(self):
+        rnaUI = self.object.get('_RNA_UI')
+        if rnaUI is None:
+            return dict()
+
+        return rnaUI.to_dict() if hasattr(rnaUI, 'to_dict') else dict(rnaUI)
+
+    def createItem(self, name, value, settings=None):
+        settings = settings if isType(settings, [dict]) else dict()
+        if hasattr(value, 'to_list'):
+            value = tuple(value.to_list())
+
+        if isType(value, [bool, int]):
+            type = 'int'
+
+        elif isType(value, [float]):
+            type = 'float'
+
+        elif isType(value, [str]):
+            type = 'string'
+
+        elif isType(value, [list, tuple]):
+            type = 'vector'
+
+        else:
+            type = value.__class__.__name__
+
+        return dict(name=name,
+                    type=type,
+                    default=settings.get('default', value),
+                    min=settings.get('min'),
+                    max=settings.get('max'),
+                    keyable=type in ['int', 'float'])
+
+    def get(self, attribute):
+        '''
+        Returns the schema of the attribute or None if it does not exist
+
+        IN:
+            [str] attribute
+
+        OUT:
+            [dict] item
+        '''
+        return self.items.get(attribute)
+
+    def exists(self, attribute):
+        return self.get(attribute) is not None
+
+    def add(self, attributes):
+        '''
+        Adds or updates attributes on the object, the _RNA_UI data is written once for all of them
+
+        IN:
+            [list] attributes : list of dicts containing name and optionally type, default, min and max
+        '''
+        rnaUI = self.readRnaUI()
+        for attribute in attributes:
+            name = attribute.get('name')
+            type = attribute.get('type')
+            default = attribute.get('default')
+            if type is None and default is not None:
+                type = self.createItem(name, default)['type']
+
+            if type not in self.defaultTypes and default is None:
+                type = 'float'
+
+            if default is None:
+                default = self.defaultTypes.get(type)
+
+            self.object[name] = default
+            settings = dict()
+            if type in ['int', 'float']:
+                settings = dict((key, attribute.get(key)) for key in ['min', 'max'] if attribute.get(key) is not None)
+                rnaUI[name] = settings
+
+            self.items[name] = self.createItem(name, default, settings)
+
+        # We need this to set min and max values
+        self.object['_RNA_UI'] = rnaUI
+
+    def remove(self, attributes):
+        '''
+        Removes attributes and their settings from the object, the _RNA_UI data is written once for all of them
+
+        IN:
+            [list] attributes : list of attribute names
+        '''
+        rnaUI = self.readRnaUI()
+        for name in attributes:
+            if name in self.object.keys():
+                del self.object[name]
+
+            rnaUI.pop(name, None)
+            self.items.pop(name, None)
+
+        if '_RNA_UI' in self.object.keys():
+            self.object['_RNA_UI'] = rnaUI
+
+
+class AttributeSchemaCache(object):
+    '''
+    This class is used internally to hold an AttributeSchema for each object.
+    The schemas are dropped whenever the scene generation changes, see SceneGeneration.
+
+    IN:
+        [func] generation : optional, function returning the current generation, default=SceneGeneration.get
+    '''
+    def __init__(self, generation=None):
+        self.generation = generation or SceneGeneration.get
+        self.current = None
+        self.items = dict()
+
+    def get(self, object):
+        '''
+        Returns the AttributeSchema of the object
+
+        IN:
+            [obj] object
+
+        OUT:
+            [AttributeSchema] schema
+        '''
+        generation = self.generation()
+        if not generation == self.current:
+            self.items.clear()
+            self.current = generation
+
+        key = object.as_pointer() if hasattr(object, 'as_pointer') else id(object)
+        schema = self.items.get(key)
+        if schema is None or not schema.object == object:
+            schema = AttributeSchema(object)
+            self.items[key] = schema
+
+        return schema
+
+
+ATTRIBUTE_SCHEMAS = AttributeSchemaCache()
+
+
 def addAttr(object,
             attribute=None,
             defaultValue=None, dv=None,
@@ -1951,25 +3673,87 @@ def addAttr(object,
         [float] minValue/min      : Minimum value
         [float] maxValue/max      : Maximum value
     '''
-    defaultValue = parseArgs(defaultValue, dv, False)
-    minValue = parseArgs(minValue, min, False)
-    maxValue = parseArgs(maxValue, max, False)
-    defaultTypes = dict(int=0, float=0.0, string='', vector=(0.0, 0.0, 0.0, 0.0))
-    if type not in defaultTypes:
-        type = 'float'
+    defaultValue = parseArgs(defaultValue, dv, None)
+    minValue = parseArgs(minValue, min, None)
+    maxValue = parseArgs(maxValue, max, None)
 
     object = asObject(object)
+    attributes = [dict(name=attribute, type=type, default=defaultValue, min=minValue, max=maxValue)]
+    ATTRIBUTE_SCHEMAS.get(object).add(attributes)
+
+
+def addAttrs(objects,
+             attributes=None, at=None,
+             defaultValue=None, dv=None,
+             type=None,
+             minValue=None, min=None,
+             maxValue=None, max=None,
+             *args, **kwargs):
+    '''
+    Adds many attributes to many objects, this is the bulk version of addAttr.
+    The _RNA_UI data that holds min and max values is written once per object.
+
+    Common Usage:
+        addAttrs(controls, ['blink', 'smile'], min=0.0, max=1.0)
+        addAttrs(controls, dict(blink=dict(min=0.0, max=1.0), side=dict(type='int', dv=1)))
+
+    Required Parameters:
+        [list] objects              : The objects to operate on
+        [list] attributes/at        : The attributes to add, or a dict of attribute: settings
+                                    : where settings may contain any of the optional parameters
+
+    Optional Parameters:
+        [value] defaultValue/dv     : Default value for the attributes
+        [str]   type                : Attribute Type
+        [float] minValue/min        : Minimum value
+        [float] maxValue/max        : Maximum value
+    '''
+    attributes = parseArgs(attributes, at, None)
+    defaultValue = parseArgs(defaultValue, dv, None)
+    minValue = parseArgs(minValue, min, None)
+    maxValue = parseArgs(maxValue, max, None)
+
+    if not isType(attributes, [dict]):
+        attributes = dict((attribute, dict()) for attribute in asList(attributes))
+
+    items = []
+    for attribute, settings in attributes.items():
+        settings = settings or dict()
+        items.append(dict(name=attribute,
+                          type=settings.get('type', type),
+                          default=parseArgs(settings.get('defaultValue'), settings.get('dv'), defaultValue),
+                          min=parseArgs(settings.get('minValue'), settings.get('min'), minValue),
+                          max=parseArgs(settings.get('maxValue'), settings.get('max'), maxValue)))
+
+    for object in asObjects(objects):
+        ATTRIBUTE_SCHEMAS.get(object).add(items)
+
+
+def deleteAttr(object,
+               attribute=None, at=None,
+               *args, **kwargs):
+    '''
+    Deletes custom attributes from an object or node
+
+    Common Usage:
+        deleteAttr('Cube.blink')
+        deleteAttr(control, ['blink', 'smile'])
+
+    Required Parameters:
+        [obj] object              : The object to operate on, or an 'object.attribute' string
+        [str] attribute/at        : The attribute or list of attributes to delete
+    '''
+    attribute = parseArgs(attribute, at, None)
+    if attribute is None:
+        object, attribute = parseObjectAttribute(object, None)
 
-    # We need this to set min and max values
-    if not '_RNA_UI' in object.keys():
-        object['_RNA_UI'] = dict()
+    else:
+        object = asObject(object)
 
-    if not defaultValue:
-        defaultValue = defaultTypes.get(type)
+    if not object:
+        raise RuntimeError('deleteAttr: could not find the object to delete attributes from')
 
-    object[attribute] = defaultValue
-    if type in ['int', 'float']:
-        object['_RNA_UI'][attribute] = dict(min=min, max=max)
+    ATTRIBUTE_SCHEMAS.get(object).remove(asList(attribute))
 
 
 def attributeQuery(attribute,
@@ -2022,36 +3806,27 @@ def attributeQuery(attribute,
         raise RuntimeError('No flag specified to query')
 
     attribute = resolveAttributeName(attribute, object=node)
+    schema = ATTRIBUTE_SCHEMAS.get(node)
+    item = schema.get(attribute)
 
     if exists:
-        return bool(attribute in listAttr(node))
-
-    if keyable:
-        return getAttr(node, attribute, keyable=True)
-
-    # Check if min/max are set
-    if '_RNA_UI' not in object.keys() or attribute not in object['_RNA_UI'].keys():
-        if any([minExists, maxExists]):
-            return False
-
-        elif range:
-            return (None, None)
+        if item is not None:
+            return not attribute.startswith('_')
 
-        return None
+        if attribute == 'hide' or attribute in CONSTANTS.transformAttributes:
+            return hasattr(node, getAttributeIndex(attribute)[0])
 
-    # Check that the data has been set correctly
-    attrData = object['_RNA_UI'].get(attribute)
-    if not attrData or not isType(attrData, [dict]):
-        if any([minExists, maxExists]):
-            return False
+        return False
 
-        elif range:
-            return (None, None)
+    if keyable:
+        if item is not None:
+            return item['keyable']
 
-        return None
+        return getAttr(node, attribute, keyable=True)
 
-    min = attrData.get('min') or None
-    max = attrData.get('max') or None
+    # Check if min/max are set
+    min = item.get('min') if item else None
+    max = item.get('max') if item else None
 
     if minExists:
         return bool(min is not None)
@@ -2142,6 +3917,7 @@ def disconnectAttr(source, target=None, *args, **kwargs):
     # If we are not specifying a pair of attributes, remove the driver
     if target is None:
         sourceObject.driver_remove(driver.data_path, driver.array_index)
+        FCURVE_INDEX.invalidate((sourceObject.id_data.as_pointer(), 'drivers'))
         return True
 
     targetObject, targetAttribute = parseObjectAttribute(target)
@@ -2164,7 +3940,7 @@ def disconnectAttr(source, target=None, *args, **kwargs):
     return hasRemovedDriver
 
 
-def breakConnections(object, attribute,
+def breakConnections(object, attribute=None,
                      includeAnimationCurves=None, iac=None,
                      *args, **kwargs):
     '''
@@ -2236,13 +4012,18 @@ def breakConnections(object, attribute,
             if hasattr(constraint, 'use_{0}'.format(index)) and getattr(constraint, 'use_{0}'.format(index)):
                 setattr(constraint, 'use_{0}'.format(index), False)
 
+        if constraints:
+            SceneGeneration.increment()
+
     # Now we can remove animation curves
     if not includeAnimationCurves:
         return True
 
     animationCurve = getFCurve(object, attribute)
     if animationCurve:
-        object.animation_data.action.fcurves.remove(animationCurve)
+        action = object.animation_data.action
+        action.fcurves.remove(animationCurve)
+        FCURVE_INDEX.invalidate((action.as_pointer(), 'fcurves'))
 
     return True
 
@@ -2271,10 +4052,10 @@ def listConnections(connections=None,
         [str]  type/t                 : if true will return objects matching this type
     '''
     def getDrivers(obj, attr=None, source=False, desitination=False, plugs=False,
-                   returnDrivers=True, allDrivers=None):
+                   returnDrivers=True, allDrivers=None, driverMap=None):
         drivers = []
         if source:
-            driver = getDriver(obj, attr)
+            driver = driverMap.get(getDriverKey(attr))
             if driver:
                 item = driver
                 info = getDriverInfo(driver)
@@ -2417,9 +4198,10 @@ def listConnections(connections=None,
     for obj, attrs in connections.items():
         if not type == bpy.types.FCurve:
             drivers = []
+            driverMap = getDriverMap(obj)
             for attr in attrs:
                 drivers += getDrivers(obj, attr, source, desitination, plugs=plugs,
-                                      returnDrivers=drivers, allDrivers=allDrivers)
+                                      returnDrivers=drivers, allDrivers=allDrivers, driverMap=driverMap)
 
             results += drivers
 
@@ -2499,34 +4281,26 @@ def bakeSimulation(objects=None, attribute=None,
     endTime = parseArgs(endTime, et, playbackOptions(max=True, query=True))
     step = parseArgs(step, s, 1) or 1
     objects = parseObjectAttributes(objects, attribute, listAttrIfEmpty=True, removeNone=True)
-    objectData = dict()
-    frame = startTime
+    times = numpy.arange(startTime, endTime + step * 0.5, step)
+    objectData = dict((object, numpy.zeros((len(times), len(attributes)))) for object, attributes in objects.items())
 
     currentFrame = currentTime(q=1)
 
-    # Gather data first
-    while frame <= endTime:
-        currentTime(frame)
-        bpy.context.scene.update()
-        for object, attributes in objects.items():
-            if object not in objectData.keys():
-                objectData[object] = dict()
-
-            for attribute in attributes:
-                if attribute not in objectData[object].keys():
-                    objectData[object][attribute] = dict()
-
-                value = getAttr(object, attribute)
-
-                objectData[object][attribute][frame] = value
-
-        frame += step
+    # Gather data first, each object's attributes are read together
+    # Fractional steps are baked on subframes, frame_set only takes a whole frame
+    scene = bpy.context.scene
+    for i, time in enumerate(times):
+        frame = int(math.floor(time))
+        scene.frame_set(frame, subframe=float(time - frame))
+        scene.update()
+        for object, attributes in objects.items():
+            objectData[object][i] = getAttrs([object], attributes)[0]
 
     # we are using cutKey, so let's make sure we leave the key copy buffer intact
     global COPY_KEY_BUFFER
     keyBuffer = COPY_KEY_BUFFER
-    for object, attributes in objectData.items():
-        for attribute, keyInfo in attributes.items():
+    for object, attributes in objects.items():
+        for column, attribute in enumerate(attributes):
             # Let's break off all connections for this attribute.
             breakConnections(object, attribute, includeAnimationCurves=False)
             # In the case that there is animation, we want to cut it, not remove it
@@ -2534,11 +4308,12 @@ def bakeSimulation(objects=None, attribute=None,
             if animationCurve:
                 cutKey(object, attribute, time=(startTime, endTime))
 
-            for key, value in keyInfo.items():
-                setKeyframe(object, attribute, time=key, value=value)
+            values = objectData[object][:, column]
+            valid = ~numpy.isnan(values)
+            setKeyframes((object, attribute), times[valid], values[valid])
 
     currentTime(currentFrame)
-    COPY_BUFFER = keyBuffer
+    COPY_KEY_BUFFER = keyBuffer
 
 
 def warning(msg, *args, **kwargs):
@@ -2638,6 +4413,8 @@ def transform(translate=None, rotate=None, scale=None,
 
         obj.data.update()
 
+    SceneGeneration.incrementEvaluation()
+
 
 def move(x=None, y=None, z=None,
          object=None,
@@ -2760,6 +4537,7 @@ def group(objects=None,
 
     bpy.context.scene.objects.active = loc
     bpy.ops.object.parent_set(type='OBJECT', keep_transform=bool(relative))
+    SceneGeneration.increment()
     if not objects and not empty:
         objects = ls(sl=1)
 
@@ -2899,6 +4677,9 @@ def delete(objects):
 
         bpy.data.objects.remove(item)
 
+    # Removed data is no longer valid in any cached lookups
+    SceneGeneration.increment()
+
     if data['ignored']:
         print('Skipped deletion of unsupported items:')
         print('\t{0}'.format(data['ignored']))
@@ -2941,6 +4722,7 @@ def fullConstraint(target, source,
         skip = [str(a).lower() for a in asList(skip) if str(a).lower() in ['x', 'y', 'z']]
 
         constraint = source.constraints.new(type)
+        SceneGeneration.increment()
         constraint.target = target
         constraint.influence = weight
 
@@ -3177,6 +4959,136 @@ def currentTime(frame=None,
             bpy.context.scene.frame_current = frame
 
 
+def getKeyframeArrays(curves, selection=False):
+    '''
+    Returns the keyframes of many curves as concatenated numpy arrays instead of lists of keys.
+    Each curve is read in bulk with foreach_get, keys for curve i are in the range offsets[i]:offsets[i+1].
+    interpolation, handle_left_type and handle_right_type hold the values of each key's enums, see getEnumValue.
+    The arrays can be edited and written back with setKeyframeArrays
+
+    IN:
+        [list] curves    : FCurves or any input supported by getFCurves
+        [bool] selection : If True indices will only include selected keys, default=False
+
+    OUT:
+        [dict] dict(curves=list, offsets=array, indices=array, co=array, handle_left=array,
+                    handle_right=array, handle_left_type=array, handle_right_type=array,
+                    interpolation=array, select=array)
+    '''
+    curves = getFCurves(curves)
+    counts = [len(curve.keyframe_points) for curve in curves]
+    offsets = numpy.zeros(len(curves) + 1, dtype=numpy.int64)
+    offsets[1:] = numpy.cumsum(counts)
+    total = int(offsets[-1])
+
+    co = numpy.zeros((total, 2), dtype=numpy.float32)
+    handleLeft = numpy.zeros((total, 2), dtype=numpy.float32)
+    handleRight = numpy.zeros((total, 2), dtype=numpy.float32)
+    handleLeftType = numpy.zeros(total, dtype=numpy.int32)
+    handleRightType = numpy.zeros(total, dtype=numpy.int32)
+    interpolation = numpy.zeros(total, dtype=numpy.int32)
+    select = numpy.zeros(total, dtype=bool)
+
+    for i, curve in enumerate(curves):
+        start, end = int(offsets[i]), int(offsets[i+1])
+        if start == end:
+            continue
+
+        points = curve.keyframe_points
+        points.foreach_get('co', co[start:end].reshape(-1))
+        points.foreach_get('handle_left', handleLeft[start:end].reshape(-1))
+        points.foreach_get('handle_right', handleRight[start:end].reshape(-1))
+        points.foreach_get('handle_left_type', handleLeftType[start:end])
+        points.foreach_get('handle_right_type', handleRightType[start:end])
+        points.foreach_get('interpolation', interpolation[start:end])
+        points.foreach_get('select_control_point', select[start:end])
+
+    indices = numpy.flatnonzero(select) if selection else numpy.arange(total)
+    return dict(curves=curves, offsets=offsets, indices=indices, co=co, handle_left=handleLeft,
+                handle_right=handleRight, handle_left_type=handleLeftType, handle_right_type=handleRightType,
+                interpolation=interpolation, select=select)
+
+
+def getEnumValue(type, attribute, name):
+    '''
+    This function is used internally, it returns the value of an enum item as used by foreach_get and foreach_set
+
+    IN:
+        [type] type      : The bpy type, for example bpy.types.Keyframe
+        [str]  attribute : The enum property, for example interpolation
+        [str]  name      : The enum item, for example BEZIER
+
+    OUT:
+        [int] value
+    '''
+    return type.bl_rna.properties[attribute].enum_items[name].value
+
+
+def resizeKeyframes(curve, count):
+    '''
+    This function is used internally, it adds or removes keys at the end of a curve until it has count keys.
+    The keys are not sorted or updated, their values should be written with setKeyframeArrays
+
+    IN:
+        [FCurve] curve
+        [int]    count
+    '''
+    points = curve.keyframe_points
+    difference = count - len(points)
+    if difference > 0:
+        points.add(difference)
+
+    for key in reversed(list(points)[count:]):
+        points.remove(key, fast=True)
+
+
+def setKeyframeArrays(arrays, update=True, mask=None, resize=False):
+    '''
+    Writes keyframes back to their curves in bulk with foreach_set.
+    The arrays must be in the layout returned by getKeyframeArrays and unless resize is True the curves
+    must still have the same number of keys. Only co, handles, handle types, interpolation and select are
+    written, any that are missing are left untouched.
+
+    IN:
+        [dict]  arrays : dict(curves=list, offsets=array, co=array, handle_left=array, ...)
+        [bool]  update : If True the curves are updated to sort keys and recalculate handles, default=True
+        [array] mask   : optional, a bool per key, only curves with at least one True key are written
+        [bool]  resize : If True keys are added to or removed from the end of each curve to match the arrays,
+                       : new keys should be given all of the arrays, default=False
+    '''
+    curves = arrays.get('curves')
+    offsets = arrays.get('offsets')
+
+    values = dict()
+    for attr, dtype in [('co', numpy.float32), ('handle_left', numpy.float32), ('handle_right', numpy.float32),
+                        ('handle_left_type', numpy.int32), ('handle_right_type', numpy.int32),
+                        ('interpolation', numpy.int32), ('select', bool)]:
+        if arrays.get(attr) is None:
+            continue
+
+        values[attr] = numpy.ascontiguousarray(arrays.get(attr), dtype=dtype)
+        if not len(values[attr]) == int(offsets[-1]):
+            raise RuntimeError('setKeyframeArrays: {0} does not match the number of keys'.format(attr))
+
+    for i, curve in enumerate(curves):
+        start, end = int(offsets[i]), int(offsets[i+1])
+        points = curve.keyframe_points
+        if resize and (mask is None or mask[start:end].any()):
+            resizeKeyframes(curve, end - start)
+
+        if not len(points) == end - start:
+            raise RuntimeError('setKeyframeArrays: {0} keys have been added or removed'.format(curve.data_path))
+
+        if start == end or (mask is not None and not mask[start:end].any()):
+            continue
+
+        for attr, value in values.items():
+            points.foreach_set('select_control_point' if attr == 'select' else attr, value[start:end].reshape(-1))
+
+        if update:
+            curve.update()
+
+
 def keyframe(objects=None,
              index=None,
              time=None, t=None,
@@ -3226,7 +5138,7 @@ def keyframe(objects=None,
                 results[key] = curve
 
         if lastSelected:
-            key = li(list(results.keys())[0])
+            key = li(list(results.keys()))
             if key is None:
                 return od()
 
@@ -3236,25 +5148,6 @@ def keyframe(objects=None,
 
         return results
 
-    def offsetKey(key, index, value, absolute):
-        v = key.co[index]
-        left = key.handle_left[index]
-        right = key.handle_right[index]
-        if absolute:
-            vc = v - value
-            time = value
-            left = left - vc
-            right = right - vc
-
-        else:
-            time = v + value
-            left = left + value
-            right = right + value
-
-        key.co[index] = time
-        key.handle_left[index] = left
-        key.handle_right[index] = right
-
     time = parseArgs(time, t, None)
     absolute = parseArgs(absolute, a, None)
     relative = parseArgs(relative, r, None)
@@ -3288,11 +5181,11 @@ def keyframe(objects=None,
 
     results = []
 
-    keys = getKeys(curves, time=time, selected=selected, lastSelected=lastSelected)
-    if returnKeys and query:
-        return keys
-
     if query:
+        keys = getKeys(curves, time=time, selected=selected, lastSelected=lastSelected)
+        if returnKeys:
+            return keys
+
         if indexValue:
             for curve in curves:
                 pts = list(curve.keyframe_points)
@@ -3318,18 +5211,198 @@ def keyframe(objects=None,
     if not any([doTimeChange, doValueChange]):
         return False
 
-    timeChange = asFloat(timeChange)
-    valueChange = asFloat(valueChange)
-    for key in keys.keys():
-        if doTimeChange:
-            offsetKey(key, 0, timeChange, absolute)
+    # Edit all of the keys as arrays, see getKeyframeArrays
+    arrays = getKeyframeArrays(curves)
+    co = arrays['co']
+    mask = numpy.ones(len(co), dtype=bool)
+    if time is not None:
+        time = parseDouble(time)
+        mask &= (time[0] < co[:, 0]) & (co[:, 0] < time[1])
+
+    if selected or lastSelected:
+        mask &= arrays['select']
+
+    if lastSelected:
+        indices = numpy.flatnonzero(mask)
+        mask[:] = False
+        mask[indices[-1:]] = True
+
+    for index, change, doChange in [(0, timeChange, doTimeChange), (1, valueChange, doValueChange)]:
+        if not doChange:
+            continue
+
+        change = asFloat(change)
+        if absolute:
+            change = change - co[mask, index]
 
-        if doValueChange:
-            offsetKey(key, 1, valueChange, absolute)
+        for attr in ['co', 'handle_left', 'handle_right']:
+            arrays[attr][mask, index] += change
 
+    setKeyframeArrays(dict(curves=arrays['curves'], offsets=arrays['offsets'], co=co,
+                           handle_left=arrays['handle_left'], handle_right=arrays['handle_right']), mask=mask)
     return True
 
 
+class KeyClipboard(object):
+    '''
+    This class holds copied keyframes, it is used by copyKey and pasteKey as the key copy buffer.
+    The keys of each copied curve are stored as a structured numpy array of co, handles, handle types and
+    interpolation, along with the plug they were copied from. Nothing references the original curves so the
+    clipboard stays valid when they change, and it can be saved to a file and loaded in another session.
+
+    Usage:
+        copyKey(objects)
+        COPY_KEY_BUFFER.save('/tmp/keys.npz')
+
+        # Another session
+        pasteKey(objects, clipboard=KeyClipboard.load('/tmp/keys.npz'))
+    '''
+    keyType = numpy.dtype([('co', numpy.float32, 2),
+                           ('handle_left', numpy.float32, 2),
+                           ('handle_right', numpy.float32, 2),
+                           ('handle_left_type', numpy.int32),
+                           ('handle_right_type', numpy.int32),
+                           ('interpolation', numpy.int32)])
+
+    def __init__(self):
+        self.items = []
+
+    def __len__(self):
+        return len(self.items)
+
+    def clear(self):
+        del self.items[:]
+
+    def add(self, keys, object=None, attribute=None, dataPath=None, index=None):
+        '''
+        Adds the keys of a curve to the clipboard
+
+        IN:
+            [array] keys      : Structured array of KeyClipboard.keyType
+            [str]   object    : optional, Name of the object the keys were copied from,
+                              : curves copied directly have no object
+            [str]   attribute : optional, The attribute the keys were copied from
+            [str]   dataPath  : optional, The data path of the curve
+            [int]   index     : optional, The array index of the curve
+        '''
+        self.items.append(dict(object=object, attribute=attribute, dataPath=dataPath, index=index,
+                               keys=numpy.asarray(keys, dtype=self.keyType)))
+
+    def addArrays(self, arrays, i, mask=None, object=None, attribute=None):
+        '''
+        Adds the keys of a curve from the arrays returned by getKeyframeArrays
+
+        IN:
+            [dict]  arrays    : The arrays returned by getKeyframeArrays
+            [int]   i         : The index of the curve in the arrays
+            [array] mask      : optional, a bool per key of the curve, only True keys are added
+            [str]   object    : optional, Name of the object the keys were copied from
+            [str]   attribute : optional, The attribute the keys were copied from
+        '''
+        curve = arrays['curves'][i]
+        keys = self.getKeys(arrays, i)
+        if mask is not None:
+            keys = keys[mask]
+
+        self.add(keys, object=object, attribute=attribute, dataPath=curve.data_path, index=curve.array_index)
+
+    @classmethod
+    def getKeys(cls, arrays, i):
+        '''
+        Returns the keys of a curve from the arrays returned by getKeyframeArrays as a structured array
+
+        IN:
+            [dict] arrays : The arrays returned by getKeyframeArrays
+            [int]  i      : The index of the curve in the arrays
+
+        OUT:
+            [array] keys  : Structured array of KeyClipboard.keyType
+        '''
+        start, end = int(arrays['offsets'][i]), int(arrays['offsets'][i+1])
+        keys = numpy.zeros(end - start, dtype=cls.keyType)
+        for name in cls.keyType.names:
+            keys[name] = arrays[name][start:end]
+
+        return keys
+
+    def getCurves(self):
+        '''
+        Returns the items copied directly from curves
+        '''
+        return [item for item in self.items if item['object'] is None]
+
+    def getData(self):
+        '''
+        Returns the items copied from objects, as an ordered dict of object: [items]
+        '''
+        results = od()
+        for item in self.items:
+            if item['object'] is None:
+                continue
+
+            results.setdefault(item['object'], []).append(item)
+
+        return results
+
+    @staticmethod
+    def getPath(path):
+        '''
+        Returns the path with the .npz extension numpy.savez_compressed adds, so save and load use the same file
+        '''
+        path = str(path)
+        return path if path.lower().endswith('.npz') else '{0}.npz'.format(path)
+
+    def save(self, path):
+        '''
+        Saves the clipboard to a compressed numpy file, .npz is added to the path if it is missing
+
+        IN:
+            [str] path
+        '''
+        metadata = [dict((key, value) for key, value in item.items() if not key == 'keys') for item in self.items]
+        arrays = dict(('keys{0}'.format(i), item['keys']) for i, item in enumerate(self.items))
+        numpy.savez_compressed(self.getPath(path), metadata=numpy.array(json.dumps(metadata)), **arrays)
+
+    @classmethod
+    def load(cls, path):
+        '''
+        Loads a clipboard saved with save, .npz is added to the path if it is missing
+
+        IN:
+            [str] path
+
+        OUT:
+            [KeyClipboard] clipboard
+        '''
+        clipboard = cls()
+        with numpy.load(cls.getPath(path)) as data:
+            metadata = json.loads(str(data['metadata']))
+            for i, item in enumerate(metadata):
+                clipboard.add(data['keys{0}'.format(i)], **item)
+
+        return clipboard
+
+
+global COPY_KEY_BUFFER
+COPY_KEY_BUFFER = KeyClipboard()
+
+
+def setCurveKeys(curve, keys):
+    '''
+    Replaces all of the keys of a curve with a structured array of keys in one bulk write.
+    The curve is resized once, written with foreach_set and updated, see setKeyframeArrays
+
+    IN:
+        [FCurve] curve
+        [array]  keys  : Structured array of KeyClipboard.keyType, sorted by time
+    '''
+    arrays = dict(curves=[curve], offsets=numpy.array([0, len(keys)]), select=numpy.zeros(len(keys), dtype=bool))
+    for name in KeyClipboard.keyType.names:
+        arrays[name] = keys[name]
+
+    setKeyframeArrays(arrays, resize=True)
+
+
 def copyKey(objects,
             attribute=None, at=None,
             time=None, t=None,
@@ -3337,7 +5410,7 @@ def copyKey(objects,
             cut=None, c=None,
             *args, **kwargs):
     '''
-    This function is used Copy keyframes to the keyframe buffer
+    This function is used Copy keyframes to the keyframe buffer, see KeyClipboard
     If a curve is provided it will be added to the curves portion of the stored results
 
     Optional Parameters:
@@ -3348,45 +5421,8 @@ def copyKey(objects,
         [bool]  cut/c                  : If True will delete the keys after copying, default=False
 
     OUT:
-        [dict] keys copied to buffer
-
-    Format:
-        {
-            object : {
-                attribute: [keys]
-            }
-            'curves': {
-                curve: [keys]
-            }
-        }
-    '''
-    def getKeyInfo(curve, time=None, cut=None):
-        keyData = keyframe(curves, time=time, keys=True, query=True)
-        results = []
-
-        for key in list(keyData.keys()):
-            if time is not None and not (time[0] <= key.co[1] <= time[1]):
-                continue
-
-            item = dict(key=key, curve=curve)
-            for value in ['handle_left_type', 'handle_right_type', 'interpolation']:
-                item[value] = getattr(key, value)
-
-            for value in ['co', 'handle_left', 'handle_right']:
-                item[value] = tuple(getattr(key, value))
-
-            results.append(item)
-
-        if cut not in [None, False, 0]:
-            for item in results:
-                key = item.get('key')
-                if key not in curve.keyframe_points:
-                    continue
-
-                curve.keyframe_points.remove(key)
-
-        return results
-
+        [KeyClipboard] keys copied to buffer
+    '''
     global COPY_KEY_BUFFER
     attribute = parseArgs(attribute, at, None)
     time = parseArgs(time, t, None)
@@ -3396,13 +5432,12 @@ def copyKey(objects,
     if time is not None:
         time = parseDouble(time)
 
+    if value is not None:
+        value = parseDouble(value)
+
     if objects is None:
         objects = ls(sl=1)
 
-    results = od()
-    results['curves'] = od()
-    results['data'] = od()
-
     curves = []
     if isType(objects, bpy.types.FCurve):
         curves = [objects]
@@ -3410,23 +5445,35 @@ def copyKey(objects,
     elif isType(objects, [list, tuple]):
         curves = [c for c in objects if isType(c, [bpy.types.FCurve])]
 
-    if curves:
-        for curve in curves:
-            keyInfo = getKeyInfo(curve)
-            results['curves'][curve] = keyInfo
+    # Curves are copied first, then each object attribute pair
+    plugs = [(None, None)] * len(curves)
+    for plug in getPlugTable(objects, attribute).asPlugs(listAttrIfEmpty=True):
+        curve = getFCurve(plug)
+        if not curve:
+            continue
 
-    data = parseObjectAttributes(objects, attributes=attribute, listAttrIfEmpty=True, removeNone=True)
-    for object, attributes in data.items():
-        for attribute in attributes:
-            curve = getFCurve(object, attribute)
-            if not curve:
-                continue
+        curves.append(curve)
+        plugs.append((plug.object.name, plug.attribute))
 
-            keyInfo = getKeyInfo(curve)
-            if object not in results.keys():
-                results['data'][object] = dict()
+    arrays = getKeyframeArrays(curves)
+    co = arrays['co']
+    mask = numpy.ones(len(co), dtype=bool)
+    if time is not None:
+        mask &= (time[0] <= co[:, 0]) & (co[:, 0] <= time[1])
+
+    if value is not None:
+        mask &= (value[0] <= co[:, 1]) & (co[:, 1] <= value[1])
 
-            results['data'][object][attribute] = keyInfo
+    results = KeyClipboard()
+    offsets = arrays['offsets']
+    for i, (object, attribute) in enumerate(plugs):
+        results.addArrays(arrays, i, mask=mask[offsets[i]:offsets[i+1]], object=object, attribute=attribute)
+
+    if cut not in [None, False, 0]:
+        for i, curve in enumerate(curves):
+            curveMask = mask[offsets[i]:offsets[i+1]]
+            if curveMask.any():
+                setCurveKeys(curve, KeyClipboard.getKeys(arrays, i)[~curveMask])
 
     COPY_KEY_BUFFER = results
 
@@ -3461,11 +5508,14 @@ def pasteKey(objects,
              attribute=None, at=None,
              time=None, t=None,
              option=None, o=None,
+             clipboard=None, cb=None,
              *args, **kwargs):
     '''
     This function is used Copy keyframes to the keyframe buffer
     If objects is a list of FCurves, only FCurves are taken into account.
     You cannot mix FCurves and object attribute pairs at this stage
+    Objects are paired with the copied objects in order, their keys are pasted onto the attributes they were
+    copied from unless attributes are specified, which are then paired with the copied keys in order.
     If a time range is not specified, the range is determined from the start/end of key length
 
     Optional Parameters:
@@ -3473,6 +5523,7 @@ def pasteKey(objects,
         [str]   attribute/at           : The attribute or list of attributes to keyframe, Not used if objects is a list of tuples
         [float] time/t                 : The time or time range, default = all keys
         [str]   option/o               : Paste Option, default=insert
+        [KeyClipboard] clipboard/cb    : The keys to paste, default=The key copy buffer
 
     OUT:
         [list] keys copied to buffer
@@ -3485,45 +5536,49 @@ def pasteKey(objects,
         scaleReplace           : As above but will use replace mode
         scaleReplaceCompletely : As above but will use replaceCompletely mode
     '''
-    def applyData(curve, keyInfo, time=None, option=None):
-        times = [k['co'][0] for k in keyInfo]
-        keyRange = (min(times), max(times))
+    def applyData(curve, keys, time=None, option=None):
+        # The surviving and pasted keys are worked out as arrays then written in one go, see setCurveKeys
+        if not len(keys):
+            return
+
+        times = keys['co'][:, 0]
+        keyRange = (float(times.min()), float(times.max()))
 
         if not time:
             time = keyRange
 
-        if option in ['replaceCompletely', 'scaleReplaceCompletely']:
-            for key in curve.keyframe_points:
-                curve.keyframe_points.remove(key)
+        if option in ['scaleInsert', 'scaleReplace', 'scaleReplaceCompletely']:
+            keys = keys.copy()
+            if not keyRange == time and not keyRange[0] == keyRange[1]:
+                # Adjust time values here
+                scale = (time[1] - time[0]) / (keyRange[1] - keyRange[0])
+                for attr in ['co', 'handle_left', 'handle_right']:
+                    keys[attr][:, 0] = (keys[attr][:, 0] - keyRange[0]) * scale + time[0]
 
-        if option in ['replace', 'scaleReplace']:
-            for key in curve.keyframe_points:
-                if time[0] <= key.co[0] <= time[1]:
-                    curve.keyframe_points.remove(key)
+        else:
+            keys = keys[(time[0] <= times) & (times <= time[1])]
 
-        for item in keyInfo:
-            offset = 0
-            co = item['co']
-            if not (time[0] <= co[0] <= time[1]):
-                continue
+        existing = KeyClipboard.getKeys(getKeyframeArrays([curve]), 0)
+        existingTimes = existing['co'][:, 0]
+        if option in ['replaceCompletely', 'scaleReplaceCompletely']:
+            existing = existing[:0]
 
-            if option in ['scaleInsert', 'scaleReplace', 'scaleReplaceCompletely'] and not keyRange == time:
-                # Adjust time values here
-                newValue = scaleInRange(co[0], keyRange, time)
-                offset = co[0] - newValue
+        elif option in ['replace', 'scaleReplace']:
+            existing = existing[(existingTimes < time[0]) | (time[1] < existingTimes)]
 
-            key = curve.keyframe_points.insert(co[0]+offset, co[1])
-            for attr in ['handle_left', 'handle_right']:
-                value = item.get(attr) + offset
-                setattr(key, attr, value)
+        else:
+            existing = existing[~numpy.isin(existingTimes, keys['co'][:, 0])]
 
-            for attr in ['handle_left_type', 'handle_right_type', 'interpolation']:
-                setattr(key, attr, item.get(attr))
+        merged = numpy.concatenate([existing, keys])
+        setCurveKeys(curve, merged[numpy.argsort(merged['co'][:, 0], kind='stable')])
 
-    global COPY_KEY_BUFFER
     attribute = parseArgs(attribute, at, None)
     time = parseArgs(time, t, None)
     option = parseArgs(option, o, 'insert')
+    clipboard = parseArgs(clipboard, cb, COPY_KEY_BUFFER)
+
+    if time is not None:
+        time = parseDouble(time)
 
     if objects is None:
         objects = ls(sl=1)
@@ -3536,51 +5591,34 @@ def pasteKey(objects,
         curves = [c for c in objects if isType(c, [bpy.types.FCurve])]
 
     # We paste based on order, if copy=(A, B, C), and objects=(C, A, B), (C=A, A=B, B=C)
-    data = parseObjectAttributes(objects, attributes=attribute, listAttrIfEmpty=True, removeNone=True)
-    curveInfo = COPY_KEY_BUFFER.get('curves')
-    objectInfo = COPY_KEY_BUFFER.get('data')
-
     # If curves are input, only deal with curves at this stage, grab data until you run out.
     if curves:
-        i = 0
-        if curveInfo:
-            for curve, keyInfo in curveInfo.items():
-                if i >= len(curves):
-                    return
-
-                applyData(curves[i], keyInfo, option=option)
-                i += 1
+        for curve, item in zip(curves, clipboard.getCurves() + [i for i in clipboard.items if i['object']]):
+            applyData(curve, item['keys'], time=time, option=option)
 
-        for object, attributes in objectInfo.items():
-            for attribute, keyInfo in attributes.items():
-                if i >= len(curves):
-                    return
+        return curves
 
-                applyData(curves[i], keyInfo, option=option)
-                i += 1
+    table = getPlugTable(objects, attribute)
+    targets = od((object, []) for object in table.objects)
+    for plug in table.asPlugs():
+        targets[plug.object].append(plug)
 
-        return
+    for (object, plugs), items in zip(targets.items(), clipboard.getData().values()):
+        if not plugs:
+            # Match the copied attributes, skipping any the target does not have
+            pairs = [(Plug(object, item['attribute']), item) for item in items
+                     if item['attribute'] and getAttributePointer(object, item['attribute']) is not None]
 
-    objectInfoKeys = list(objectInfo.keys())
-    iO = 0
-    for object, attributes in data:
-        if iO >= len(objectInfoKeys):
-            return
+        else:
+            pairs = zip(plugs, items)
 
-        attributeData = objectInfo[objectInfoKeys[i]]
-        attributeKeys = list(attributeData.keys())
-        iA = 0
-        for attribute in attributes:
-            if iA >= len(attributeKeys):
+        for plug, item in pairs:
+            curve = getFCurve(plug, createIfNotExists=True)
+            if not curve:
                 continue
 
-            keyInfo = attributeData[attributeKeys[i]]
-            curve = getFCurve(object, attribute, createIfNotExists=True)
-            applyData(curve, keyInfo, option=option)
-
-            iA += 1
-
-        iO += 1
+            applyData(curve, item['keys'], time=time, option=option)
+            curves.append(curve)
 
     return curves
 
@@ -3595,9 +5633,11 @@ def scaleKey(objects=None,
              newStartTime=None, nst=None,
              newEndTime=None, net=None,
              newStartValue=None, nsv=None,
-             newEndValue=None, nev=None):
+             newEndValue=None, nev=None,
+             sharedRange=None, sr=None):
     '''
     This function will scale keys
+    All of the targeted curves are scaled at once as arrays, see getKeyframeArrays
 
     Optional Parameters:
         [obj]   objects                : Object or objects to query, optionally a list of tuples of object attribute pairs
@@ -3611,17 +5651,9 @@ def scaleKey(objects=None,
         [float] newEndTime/net         : End time for absolute range
         [float] newStartValue/nsv      : Minimum value for value scaling
         [float] newEndValue/nev        : Maximum value for value scaling
+        [bool]  sharedRange/sr         : If True the range of all curves together is scaled to the new range,
+                                       : otherwise each curve's own range is, default=False
     '''
-    def parsePivot(start, end, pivot, scale):
-        newStart = (start-pivot) * scale
-        newEnd = (end-pivot) * scale
-        return (newStart, newEnd)
-
-    def scaleIt(key, start, end, axis):
-        setattr(key.co, axis, scaleInRange(keyRange, (start, end), getattr(key.co, axis)))
-        setattr(key.handle_left, axis, scaleInRange(keyRange, (start, end), getattr(key.handle_left, axis)))
-        setattr(key.handle_right, axis, scaleInRange(keyRange, (start, end), getattr(key.handle_right, axis)))
-
     attribute = parseArgs(attribute, at, None)
     time = parseArgs(time, t, None)
     timeScale = parseArgs(timeScale, ts, None)
@@ -3632,6 +5664,7 @@ def scaleKey(objects=None,
     newEndTime = parseArgs(newEndTime, net, None)
     newStartValue = parseArgs(newStartValue, nsv, None)
     newEndValue = parseArgs(newEndValue, nev, None)
+    sharedRange = parseArgs(sharedRange, sr, False)
 
     if time is not None:
         time = parseDouble(time)
@@ -3644,61 +5677,60 @@ def scaleKey(objects=None,
         curves = [c for c in objects if isType(c, [bpy.types.FCurve])]
 
     if not curves:
-        if attribute:
-            data = parseObjectAttributes(objects, attributes=attribute, listAttrIfEmpty=True, removeNone=True)
-
-        else:
-            data = objects
-
-        curves = getFCurves(data, createIfNotExists=False)
+        curves = getFCurves(getPlugTable(objects, attribute), createIfNotExists=False)
 
     if not curves:
         return
 
-    for curve in curves:
-        # Store these so we don't overwrite originals
-        _nst, _net = (newStartTime, newEndTime)
-        _nsv, _nev = (newStartValue, newEndValue)
-        keys = list(curve.keyframe_points)
-        if time:
-            keys = [k for k in keys if time[0] < k['co'][0] < time[1]]
-
-        timeValues = {}
-        for key in keys:
-            _co = key['co']
-            timeValues[_co[0]] = _co[1]
-
-        keyRange = (min(timeValues.keys()), max(timeValues.keys()))
-        valueRange = (min(timeValues.values()), max(timeValues.values()))
+    arrays = getKeyframeArrays(curves)
+    co = arrays['co']
+    offsets = arrays['offsets']
+    curveIndices = numpy.repeat(numpy.arange(len(curves)), numpy.diff(offsets))
+    mask = numpy.ones(len(co), dtype=bool)
+    if time:
+        mask &= (time[0] < co[:, 0]) & (co[:, 0] < time[1])
 
-        if timeScale is not None:
-            _nst, _net = parsePivot(keyRange[0], keyRange[1], timePivot, timeScale)
-
-        if valueScale is not None:
-            _nsv, _nev = parsePivot(valueRange[0], valueRange[1], valuePivot, valueScale)
-
-        # Due to this method you cannot have a specific range and a scale, this is intentional
-        if _nst is not None or _net is not None:
-            if _nst is None:
-                _nst = keyRange[0]
-
-            if _net is None:
-                _net = keyRange[1]
-
-        if _nsv is not None or _nev is not None:
-            if _nsv is None:
-                _nsv = valueRange[0]
+    if not mask.any():
+        return curves
 
-            if _nev is None:
-                _nev = valueRange[1]
+    # Each curve's range, or the range of all curves when sharing one range
+    # Groups are renumbered to the curves that have keys in range, so every range has values
+    groups = numpy.zeros(mask.sum(), dtype=numpy.int64) if sharedRange else curveIndices[mask]
+    groups = numpy.unique(groups, return_inverse=True)[1].reshape(-1)
+    count = int(groups.max()) + 1
+
+    # Due to this method you cannot have a specific range and a scale, this is intentional
+    axes = [(0, timeScale, timePivot, newStartTime, newEndTime),
+            (1, valueScale, valuePivot, newStartValue, newEndValue)]
+    for axis, scale, pivot, newStart, newEnd in axes:
+        if scale is None and newStart is None and newEnd is None:
+            continue
 
-        for key in keys:
-            if _nst is not None:
-                scaleIt(key, _nst, _net, 'x')
+        values = co[mask, axis]
+        start = numpy.full(count, numpy.inf)
+        end = numpy.full(count, -numpy.inf)
+        numpy.minimum.at(start, groups, values)
+        numpy.maximum.at(end, groups, values)
 
-            if _nsv is not None:
-                scaleIt(key, _nsv, _nev, 'y')
+        if scale is not None:
+            factor = numpy.full(count, float(scale))
+            targetStart = pivot + (start - pivot) * factor
 
+        else:
+            targetStart = start if newStart is None else numpy.full(count, float(newStart))
+            targetEnd = end if newEnd is None else numpy.full(count, float(newEnd))
+            span = end - start
+            # Avoid zero division errors, single keys are left where they are
+            valid = span != 0
+            factor = numpy.where(valid, (targetEnd - targetStart) / numpy.where(valid, span, 1.0), 1.0)
+            targetStart = numpy.where(valid, targetStart, start)
+
+        factor = factor[groups]
+        for attr in ['co', 'handle_left', 'handle_right']:
+            arrays[attr][mask, axis] = (arrays[attr][mask, axis] - start[groups]) * factor + targetStart[groups]
+
+    setKeyframeArrays(dict(curves=arrays['curves'], offsets=offsets, co=co,
+                           handle_left=arrays['handle_left'], handle_right=arrays['handle_right']), mask=mask)
     return curves
 
 
@@ -3749,13 +5781,7 @@ def setKeyframe(objects=None,
         curves = [c for c in objects if isType(c, [bpy.types.FCurve])]
 
     if not curves:
-        if attribute:
-            data = parseObjectAttributes(objects, attributes=attribute, listAttrIfEmpty=True, removeNone=True)
-
-        else:
-            data = objects
-
-        curves = getFCurves(data, createIfNotExists=True)
+        curves = getFCurves(getPlugTable(objects, attribute), createIfNotExists=True)
 
     if not curves:
         return []
@@ -3787,6 +5813,85 @@ def setKeyframe(objects=None,
     return keys
 
 
+def setKeyframes(plug,
+                 times=None, t=None,
+                 values=None, v=None,
+                 interpolation=None, i=None,
+                 *args, **kwargs):
+    '''
+    Sets many keyframes on one curve at once, this is the bulk version of setKeyframe.
+    The new keys are merged with the existing keys, replacing any on the same frames, and the curve is
+    resized and written in bulk with setKeyframeArrays before being updated once.
+    New keys always get AUTO_CLAMPED handles so update can calculate them, they are not taken from the preferences.
+
+    Common Usage:
+        setKeyframes(Plug(obj, 'tx'), range(1, 101), values)
+
+    Required Parameters:
+        [Plug]  plug              : The plug or FCurve to key, or any input supported by getFCurve
+        [list]  times/t           : The times to key
+        [list]  values/v          : A value for each time
+
+    Optional Parameters:
+        [str]   interpolation/i   : Interpolation of the new keys, CONSTANT, LINEAR, BEZIER or a tangentType,
+                                  : default=The user preference
+
+    OUT:
+        [FCurve] curve
+    '''
+    times = numpy.atleast_1d(numpy.asarray(parseArgs(times, t, []), dtype=numpy.float32))
+    values = numpy.atleast_1d(numpy.asarray(parseArgs(values, v, []), dtype=numpy.float32))
+    interpolation = parseArgs(interpolation, i, None)
+    if not len(times) == len(values):
+        raise RuntimeError('setKeyframes requires a value for each time, {0} != {1}'.format(len(times), len(values)))
+
+    curve = getFCurve(plug, createIfNotExists=True)
+    if not curve:
+        raise RuntimeError('Could not get an FCurve for {0}'.format(plug))
+
+    preferences = getattr(bpy.context, 'preferences', None) or getattr(bpy.context, 'user_preferences', None)
+    # Free, aligned and vector handles are not recalculated by update, they would be left on the key itself
+    handleType = 'AUTO_CLAMPED'
+    if interpolation is None:
+        interpolation = getattr(preferences.edit, 'keyframe_new_interpolation_type', 'BEZIER')
+
+    interpolation = CONSTANTS.tangentTypes.get(str(interpolation).lower(), interpolation)
+
+    # The last of any duplicate times wins, as it would when inserting one at a time
+    times, unique = numpy.unique(times[::-1], return_index=True)
+    values = values[::-1][unique]
+
+    # Existing keys on other frames are kept as they are, new keys get their handles calculated by update
+    arrays = getKeyframeArrays([curve])
+    keep = ~numpy.isin(arrays['co'][:, 0], times)
+    keys = numpy.column_stack([times, values])
+    order = numpy.argsort(numpy.concatenate([arrays['co'][keep, 0], times]), kind='stable')
+
+    def merge(attr, value):
+        if value is None:
+            value = keys
+
+        else:
+            value = numpy.full(len(times), value, dtype=arrays[attr].dtype)
+
+        return numpy.concatenate([arrays[attr][keep], value])[order]
+
+    handleType = getEnumValue(bpy.types.Keyframe, 'handle_left_type', handleType)
+    interpolation = getEnumValue(bpy.types.Keyframe, 'interpolation', interpolation)
+    arrays = dict(curves=[curve],
+                  offsets=numpy.array([0, len(order)]),
+                  co=merge('co', None),
+                  handle_left=merge('handle_left', None),
+                  handle_right=merge('handle_right', None),
+                  handle_left_type=merge('handle_left_type', handleType),
+                  handle_right_type=merge('handle_right_type', handleType),
+                  interpolation=merge('interpolation', interpolation),
+                  select=merge('select', False))
+
+    setKeyframeArrays(arrays, resize=True)
+    return curve
+
+
 def createLocator(name=None, n=None,
                   type=None, t=None):
     '''
@@ -4101,15 +6206,71 @@ def asObjects(objects, dataType=None, forceObjects=False):
     OUT:
         [list] objects
     '''
-    results = []
-    for obj in asList(objects):
-        node = asObject(obj, dataType=dataType)
-        if not node:
+    return [item for item in resolveObjects(objects, dataType=dataType)[0] if item]
+
+
+def resolveObjects(objects, dataType=None):
+    '''
+    A bulk version of asObject, this will resolve a large list of names at once.
+    Names are grouped by their dataType and each group is resolved against the data index together,
+    names missing from the index are found with a single pass over each collection rather than once per name.
+    Plugs resolve to their object, any other input that is not a string is returned directly.
+
+    Required Parameters:
+        [list] objects
+
+    Optional Parameters:
+        [str]  dataType, a single dataType or a list of dataTypes matching the objects
+
+    OUT:
+        [tuple] ([resolved objects aligned with the input, None where not found], [unresolved names in input order])
+    '''
+    objects = asList(objects)
+    if isType(dataType, [list, tuple]):
+        dataTypes = list(dataType)
+        if not len(dataTypes) == len(objects):
+            raise RuntimeError('resolveObjects: dataType must match the length of objects')
+
+    else:
+        dataTypes = [dataType] * len(objects)
+
+    results = [None] * len(objects)
+    names = [None] * len(objects)
+    groups = od()
+    for i, obj in enumerate(objects):
+        if isType(obj, [list, tuple]):
+            obj = fi(obj)
+
+        if isType(obj, [dict]):
+            obj = fi(obj.values())
+
+        if isType(obj, Plug):
+            obj = obj.object
+
+        if not obj:
             continue
 
-        results.append(node)
+        if not issubclass(type(obj), str):
+            results[i] = obj
+            continue
 
-    return results
+        names[i] = obj
+        itemType = CONSTANTS.dataTypeConversion.get(dataTypes[i], dataTypes[i])
+        if itemType not in groups:
+            groups[itemType] = []
+
+        groups[itemType].append(i)
+
+    for itemType, indices in groups.items():
+        if itemType and itemType not in CONSTANTS.dataTypes.keys():
+            continue
+
+        items = DATA_INDEX.findAll([names[i] for i in indices], dataType=itemType)
+        for i, item in zip(indices, items):
+            results[i] = item
+
+    unresolved = [name for name, item in zip(names, results) if name is not None and item is None]
+    return (results, unresolved)
 
 
 def asObject(obj, dataType=None, forceObjects=False):
@@ -4129,9 +6290,10 @@ def asObject(obj, dataType=None, forceObjects=False):
     OUT:
         obj
     '''
-    typeConvert = dict(light='lamp', rig='armature')
-    if dataType in typeConvert.keys():
-        dataType = typeConvert.get(dataType)
+    dataType = CONSTANTS.dataTypeConversion.get(dataType, dataType)
+
+    if isType(obj, Plug):
+        return obj.object
 
     findObject = False
     if isType(obj, [list, tuple]):
@@ -4149,36 +6311,13 @@ def asObject(obj, dataType=None, forceObjects=False):
         else:
             return obj
 
-    if dataType:
-        if dataType not in CONSTANTS.dataTypes.keys():
-            return None
-
-        data = CONSTANTS.dataTypes.get(dataType)
-        if findObject and obj in data.values():
-            return obj
-
-        if not findObject:
-            item = data.get(obj)
-            if item:
-                return item
-
+    if dataType and dataType not in CONSTANTS.dataTypes.keys():
         return None
 
-    for module in [bpy.data.objects, bpy.data.meshes, bpy.data.cameras, bpy.data.lamps,
-                   bpy.data.curves, bpy.data.metaballs, bpy.data.armatures, bpy.data.lattices,
-                   bpy.data.libraries, bpy.data.texts, bpy.data.speakers, bpy.data.sounds,
-                   bpy.data.images]:
-        item = None
-        if findObject and obj in module.values():
-            item = obj
-
-        if not findObject:
-            item = module.get(obj)
-
-        if item:
-            return item
+    if findObject:
+        return obj if DATA_INDEX.contains(obj, dataType=dataType) else None
 
-    return None
+    return DATA_INDEX.find(obj, dataType=dataType)
 
 def objectType(obj, isAType=None, isa=None,\
                forceObjects=None, fo=None):
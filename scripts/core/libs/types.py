@@ -29,6 +29,10 @@ def asList(items, skipNoneType=False):
         except:
             pass
 
+    elif hasattr(items, '__next__') or hasattr(items, 'next'):
+        # Generators and other iterators
+        results = list(items)
+
     else:
         results = [items]
 
@@ -79,6 +83,10 @@ def fi(items):
     In:
         [list] items
     """
+    # Only take what we need from generators
+    if hasattr(items, '__next__'):
+        return next(items, None)
+
     items = asList(items)
 
     if len(items) == 0:
@@ -0,0 +1,112 @@
+'''
+Tests for the parts of blender.utils.cmds that can run without blender, against a fake bpy.data
+'''
+import os
+import sys
+import types
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+# cmds loads without bpy, but it imports bmesh unconditionally
+sys.modules.setdefault('bmesh', types.ModuleType('bmesh'))
+
+from blender.utils import cmds
+
+
+class FakeItem(object):
+    def __init__(self, name):
+        self.name = name
+
+    def __repr__(self):
+        return 'FakeItem({0})'.format(self.name)
+
+
+class FakeCollection(list):
+    def __init__(self, names=()):
+        super(FakeCollection, self).__init__(FakeItem(name) for name in names)
+        self.gets = 0
+
+    def get(self, name):
+        self.gets += 1
+        for item in self:
+            if item.name == name:
+                return item
+
+        return None
+
+    def new(self, name):
+        item = FakeItem(name)
+        self.append(item)
+        return item
+
+
+class FakeData(object):
+    def __init__(self):
+        self.objects = FakeCollection(['Rock', 'Tree'])
+        self.meshes = FakeCollection(['Rock', 'Grass'])
+        self.images = FakeCollection(['Sky'])
+
+
+class DataIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.data = FakeData()
+        self.generation = 0
+        self.index = cmds.DataIndex(data=self.data,
+                                    dataTypes=[('object', 'objects'), ('mesh', 'meshes'), ('image', 'images')],
+                                    generation=lambda: self.generation)
+
+    def getCount(self):
+        return sum(collection.gets for collection in [self.data.objects, self.data.meshes, self.data.images])
+
+    def testTypedFind(self):
+        self.assertIs(self.index.find('Rock', 'mesh'), self.data.meshes[0])
+        self.assertIs(self.index.find('Rock', 'object'), self.data.objects[0])
+        self.assertIsNone(self.index.find('Tree', 'mesh'))
+
+    def testUntypedFindUsesSearchOrder(self):
+        self.assertIs(self.index.find('Rock'), self.data.objects[0])
+        self.assertIs(self.index.find('Grass'), self.data.meshes[1])
+        self.assertIs(self.index.find('Sky'), self.data.images[0])
+
+    def testIndexedHitsDoNotProbeCollections(self):
+        for name in ['Rock', 'Tree', 'Grass', 'Sky'] * 10:
+            self.index.find(name)
+
+        self.assertEqual(self.getCount(), 0)
+
+    def testRenamedItemIsNotReturned(self):
+        self.index.update()
+        self.data.meshes[1].name = 'Weeds'
+        self.assertIsNone(self.index.find('Grass'))
+        self.assertIs(self.index.find('Weeds'), self.data.meshes[1])
+
+    def testRebuildsOnGeneration(self):
+        self.index.update()
+        item = self.data.objects.new('Grass')
+        self.assertIs(self.index.find('Grass'), self.data.meshes[1])
+        self.generation += 1
+        self.assertIs(self.index.find('Grass'), item)
+
+    def testAddedItemTakesPriority(self):
+        self.index.update()
+        item = self.data.objects.new('Sky')
+        self.index.add(item, 'object')
+        self.assertIs(self.index.find('Sky'), item)
+        self.assertIs(self.index.find('Sky', 'image'), self.data.images[0])
+
+    def testFindAll(self):
+        names = ['Sky', 'Missing', 'Rock', 'Grass', 'Rock']
+        self.assertEqual(self.index.findAll(names),
+                         [self.data.images[0], None, self.data.objects[0], self.data.meshes[1], self.data.objects[0]])
+        self.assertEqual(self.index.findAll(['Rock', 'Tree'], 'mesh'), [self.data.meshes[0], None])
+
+    def testContains(self):
+        self.assertTrue(self.index.contains(self.data.meshes[0]))
+        self.assertTrue(self.index.contains(self.data.meshes[0], 'mesh'))
+        self.assertFalse(self.index.contains(self.data.meshes[0], 'object'))
+        self.assertFalse(self.index.contains(FakeItem('Rock')))
+
+
+if __name__ == '__main__':
+    unittest.main()